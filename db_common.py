@@ -0,0 +1,56 @@
+# SQLite setup and search helpers shared by player_directories.db (UserDirectoryDB) and replay_index.db (ReplayIndexDB)
+import sqlite3
+
+def configure_connection(cursor, cache_kib=None):
+    """WAL lets readers (searches, range queries) run while a background thread writes,
+    and NORMAL sync is safe in WAL mode while avoiding an fsync per commit."""
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    if cache_kib:
+        cursor.execute(f"PRAGMA cache_size = -{int(cache_kib)}")
+
+def create_trigram_index(cursor, table, column):
+    """Create <table>_fts, a trigram FTS5 index over column of table (rowid id) kept in sync by triggers, and fill it
+    from table when it is new. Returns False if SQLite was built without FTS5 (or is older than 3.34 without trigram),
+    search then falls back to LIKE."""
+    fts_table = f"{table}_fts"
+    cursor.execute("SELECT name FROM sqlite_master WHERE name = ?", (fts_table,))
+    existed = cursor.fetchone() is not None
+    try:
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5(
+            {column}, content='{table}', content_rowid='id', tokenize='trigram'
+        )""")
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts_table} (rowid, {column}) VALUES (new.id, new.{column});
+        END""")
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+        END""")
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {column} ON {table} BEGIN
+            INSERT INTO {fts_table} ({fts_table}, rowid, {column}) VALUES ('delete', old.id, old.{column});
+            INSERT INTO {fts_table} (rowid, {column}) VALUES (new.id, new.{column});
+        END""")
+    except sqlite3.OperationalError:
+        return False
+    if not existed:
+        cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+    return True
+
+def split_search_tokens(tokens, has_fts):
+    """Trigrams need at least 3 characters, shorter tokens are matched with LIKE. Returns (fts tokens, like tokens)"""
+    fts_tokens = [t for t in tokens if len(t) >= 3] if has_fts else []
+    return fts_tokens, [t for t in tokens if t not in fts_tokens]
+
+def fts_phrase(token):
+    """token quoted as an FTS5 phrase, so it is matched literally"""
+    return '"{}"'.format(token.replace('"', '""'))
+
+def like_pattern(token):
+    """LIKE pattern (with ESCAPE '\\') matching token anywhere in the text"""
+    escaped = token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
@@ -0,0 +1,288 @@
+import json
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone, timedelta, date
+from urllib.parse import quote
+
+import db_common
+from workers import GENTOOL_BASE_URL
+
+class UserDirectoryDB:
+    """Gentool player directories per day and the replays listed in them, for the last 70 days"""
+    def __init__(self):
+        self.conn = sqlite3.connect("player_directories.db")
+        self.cursor = self.conn.cursor()
+        # Searches and range queries run while refresh batches are written
+        db_common.configure_connection(self.cursor, cache_kib=65536)
+        self.create_tables()
+        self.purge_expired()
+        self.dates_to_update = []
+
+    def create_tables(self):
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS directories (
+            user_id TEXT,
+            date TEXT,
+            PRIMARY KEY (user_id, date)
+        )""")
+        self.cursor.execute('''
+        CREATE TABLE IF NOT EXISTS status (
+            date TEXT CHECK(length(date) = 10) PRIMARY KEY,
+            is_complete INTEGER CHECK(is_complete IN (0, 1)),
+            etag TEXT,
+            last_modified TEXT
+        )
+        ''')
+        # Databases created before conditional refreshes lack the validator columns.
+        self.cursor.execute("PRAGMA table_info(status)")
+        status_columns = {row[1] for row in self.cursor.fetchall()}
+        for column in ('etag', 'last_modified'):
+            if column not in status_columns:
+                self.cursor.execute(f"ALTER TABLE status ADD COLUMN {column} TEXT")
+        # The primary key only serves lookups by user_id, date range scans need their own (covering) index.
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS directories_date ON directories (date, user_id)")
+        # Replays listed in each fetched player directory. A listing fetched after its day ended is final,
+        # later browses are served from these tables without requesting the listing again.
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS listings (
+            user_id TEXT,
+            date TEXT,
+            is_final INTEGER CHECK(is_final IN (0, 1)),
+            PRIMARY KEY (user_id, date)
+        )""")
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS replay_files (
+            user_id TEXT,
+            date TEXT,
+            filename TEXT,
+            size REAL,
+            timestamp TEXT,
+            url TEXT,
+            PRIMARY KEY (user_id, date, filename)
+        )""")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS replay_files_date ON replay_files (date)")
+        self.create_search_index()
+        self.conn.commit()
+
+    def create_search_index(self):
+        # Distinct user ids are kept in their own table with a trigram index on top, so substring search
+        # does not have to scan every (user_id, date) row in directories.
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE name = 'users'")
+        users_existed = self.cursor.fetchone() is not None
+
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT UNIQUE
+        )""")
+        self.cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS directories_add_user AFTER INSERT ON directories BEGIN
+            INSERT OR IGNORE INTO users (user_id) VALUES (new.user_id);
+        END""")
+
+        self.has_fts = db_common.create_trigram_index(self.cursor, 'users', 'user_id')
+
+        if not users_existed:
+            self.cursor.execute("INSERT OR IGNORE INTO users (user_id) SELECT DISTINCT user_id FROM directories")
+
+    def get_dates_between(self, start_date, end_date):
+        delta = end_date - start_date
+        return [start_date + timedelta(days=i) for i in range(delta.days + 1)]
+
+    def purge_expired(self):
+        """Delete any directory data 70 days older than today"""
+        last_day = (datetime.now(timezone.utc).date() - timedelta(days=71)).isoformat()
+
+        # Cheap check on the date index so the delete only runs once per day, not on every open.
+        self.cursor.execute("SELECT MIN(date) FROM directories")
+        oldest = self.cursor.fetchone()[0]
+        if oldest is None or oldest >= last_day:
+            return
+
+        self.cursor.execute("DELETE FROM directories WHERE date < ?", (last_day,))
+        self.cursor.execute("DELETE FROM status WHERE date < ?", (last_day,))
+        self.cursor.execute("DELETE FROM listings WHERE date < ?", (last_day,))
+        self.cursor.execute("DELETE FROM replay_files WHERE date < ?", (last_day,))
+        self.cursor.execute("""
+            DELETE FROM users
+            WHERE NOT EXISTS (SELECT 1 FROM directories WHERE directories.user_id = users.user_id)
+        """)
+        self.conn.commit()
+
+    def has_data_for_range(self, start_date, end_date):
+        date_list = self.get_dates_between(date.fromisoformat(start_date), date.fromisoformat(end_date))
+        date_strs = [d.isoformat() for d in date_list]
+        placeholders = ','.join('?' for _ in date_strs)
+        query = f"SELECT date, is_complete FROM status WHERE date IN ({placeholders})"
+        self.cursor.execute(query, date_strs)
+        results = self.cursor.fetchall()
+        completed_dates = {row[0] for row in results if row[1] == 1}
+        dates_to_process = [d for d in date_strs if d not in completed_dates]
+        self.dates_to_update = [date.fromisoformat(s) for s in dates_to_process]
+
+        return self.dates_to_update
+
+    def store_directories(self, given_date, directories, etag=None, last_modified=None):
+        """Store the directory listing fetched for a single date, inserting only directories not stored yet.
+        directories is None when the server answered 304 Not Modified."""
+        today_str = datetime.now(timezone.utc).date().isoformat()
+        if given_date > today_str:
+            return
+
+        self.cursor.execute("SELECT is_complete FROM status WHERE date = ?", (given_date,))
+        row = self.cursor.fetchone()
+        if row is not None and row[0] == 1:
+            return  # Listings of finished days do not change anymore
+
+        if directories is not None:
+            # Gentool listings only grow during the day, so diff against what is stored instead of rewriting the date.
+            self.cursor.execute("SELECT user_id FROM directories WHERE date = ?", (given_date,))
+            stored = {r[0] for r in self.cursor.fetchall()}
+            self.cursor.executemany(
+                "INSERT INTO directories (user_id, date) VALUES (?, ?)",
+                [(directory, given_date) for directory in dict.fromkeys(directories) if directory not in stored]
+            )
+
+        self.cursor.execute("""
+            INSERT INTO status (date, is_complete, etag, last_modified) VALUES (?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                is_complete = excluded.is_complete,
+                etag = COALESCE(excluded.etag, status.etag),
+                last_modified = COALESCE(excluded.last_modified, status.last_modified)
+        """, (given_date, 1 if given_date < today_str else 0, etag, last_modified))
+
+    def store_listing(self, user_id, date_str, files):
+        """Replace the stored replays of one player directory with a fetched listing,
+        files are the [name, size, date, user dir, url] rows from get_dir_files_worker"""
+        today_str = datetime.now(timezone.utc).date().isoformat()
+        self.cursor.execute("DELETE FROM replay_files WHERE user_id = ? AND date = ?", (user_id, date_str))
+        self.cursor.executemany(
+            "INSERT OR REPLACE INTO replay_files (user_id, date, filename, size, timestamp, url) VALUES (?, ?, ?, ?, ?, ?)",
+            [(user_id, date_str, name, size, timestamp, url) for name, size, timestamp, _, url in files]
+        )
+        self.cursor.execute(
+            "INSERT OR REPLACE INTO listings (user_id, date, is_final) VALUES (?, ?, ?)",
+            (user_id, date_str, 1 if date_str < today_str else 0)
+        )
+
+    def get_final_listings(self, user_dates):
+        """Return {(user_id, date): files} for the (user_id, date) directories whose final listing is stored,
+        files in the same rows as get_dir_files_worker returns"""
+        self.cursor.execute("""
+            SELECT l.user_id, l.date, f.filename, f.size, f.timestamp, f.url
+            FROM json_each(?) AS selected
+            JOIN listings l ON l.user_id = json_extract(selected.value, '$[0]') AND l.date = json_extract(selected.value, '$[1]')
+            LEFT JOIN replay_files f ON f.user_id = l.user_id AND f.date = l.date
+            WHERE l.is_final = 1
+        """, (json.dumps(list(user_dates)),))
+        listings = {}
+        for user_id, date_str, filename, size, timestamp, url in self.cursor.fetchall():
+            files = listings.setdefault((user_id, date_str), [])
+            if filename is not None:  # Directory without replays
+                files.append([filename, size, timestamp, user_id, url])
+        return listings
+
+    def get_validators(self, date_str):
+        """Return the (etag, last_modified) of the last listing fetched for date_str, for conditional requests"""
+        self.cursor.execute("SELECT etag, last_modified FROM status WHERE date = ?", (date_str,))
+        return self.cursor.fetchone() or (None, None)
+
+    def search_users(self, start_date, end_date, query):
+        """Search users with name matching any of the query tokens, best matches first"""
+        tokens = list(dict.fromkeys(query.lower().split()))
+        if not tokens:
+            return []
+
+        # Tokens too short for trigrams are matched with LIKE against the users table
+        fts_tokens, like_tokens = db_common.split_search_tokens(tokens, self.has_fts)
+        like_patterns = [db_common.like_pattern(t) for t in tokens]
+
+        candidates = []
+        params = []
+        if fts_tokens:
+            candidates.append("SELECT rowid FROM users_fts WHERE users_fts MATCH ?")
+            params.append(" OR ".join(db_common.fts_phrase(t) for t in fts_tokens))
+        if like_tokens:
+            candidates.append("SELECT id FROM users WHERE " + " OR ".join("user_id LIKE ? ESCAPE '\\'" for _ in like_tokens))
+            params.extend(db_common.like_pattern(t) for t in like_tokens)
+
+        hits = " + ".join("(u.user_id LIKE ? ESCAPE '\\')" for _ in like_patterns)
+        params.extend(like_patterns)
+        params.extend((start_date, end_date))
+
+        self.cursor.execute(f"""
+            WITH matched(id) AS ({" UNION ".join(candidates)})
+            SELECT u.user_id, COUNT(*) AS days, {hits} AS hits
+            FROM matched
+            JOIN users u ON u.id = matched.id
+            JOIN directories d ON d.user_id = u.user_id
+            WHERE d.date BETWEEN ? AND ?
+            GROUP BY u.user_id
+            ORDER BY hits DESC, days DESC, u.user_id
+        """, params)
+        return [(user_id, days) for user_id, days, _ in self.cursor.fetchall()]
+
+    def get_directory_dates_for_range(self, user_dirs, start_date, end_date):
+        # Resolve every selected directory in one round trip by joining the selection (as a json array) against directories.
+        self.cursor.execute("""
+            SELECT d.user_id, d.date
+            FROM json_each(?) AS selected
+            JOIN directories d ON d.user_id = selected.value
+            WHERE d.date BETWEEN ? AND ?
+            ORDER BY selected.key, d.date
+        """, (json.dumps(list(user_dirs)), start_date, end_date))
+        rows = self.cursor.fetchall()
+
+        # Only the date part of the url differs between directories of the same day, so build it once per date.
+        base_url = GENTOOL_BASE_URL
+        date_urls = {}
+        for date_str in {row[1] for row in rows}:
+            d = datetime.strptime(date_str, "%Y-%m-%d")
+            date_urls[date_str] = (f"{base_url}/{d.strftime("%Y_%m_%B/%d_%A")}/", d)
+
+        urls_to_check = []
+        for udir, date_str in rows:
+            date_url, d = date_urls[date_str]
+            urls_to_check.append((f"{date_url}{quote(udir)}", udir, d))
+        return urls_to_check
+
+
+class DirectoryDBWriter(threading.Thread):
+    """Owns the write connection to player_directories.db and applies queued writes in batched transactions"""
+    def __init__(self, on_commit=None):
+        super().__init__(daemon=True)
+        self.queue = queue.Queue()
+        self.on_commit = on_commit
+
+    def submit(self, method, *args):
+        """Queue a call to a UserDirectoryDB method, executed on the writer thread"""
+        self.queue.put((method, args))
+
+    def stop(self):
+        self.queue.put(None)
+
+    def run(self):
+        db = UserDirectoryDB()
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            # Drain everything that is already queued so a burst of results lands in one transaction.
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for item in batch:
+                if item is None:
+                    stopping = True
+                    continue
+                method, args = item
+                try:
+                    getattr(db, method)(*args)
+                except Exception as e:
+                    print(f"Error writing to directory database ({method}): {e}")
+            db.conn.commit()
+            if self.on_commit:
+                self.on_commit()
+        db.conn.close()
@@ -0,0 +1,128 @@
+import time
+import threading
+
+class Job:
+    """A background operation. The code doing the work reports progress through update() from any thread
+    and stops early once is_cancelled() returns True."""
+    def __init__(self, manager, title, total=0):
+        self.manager = manager
+        self.title = title
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.message = ""
+        self.state = 'running'  # 'running', 'done', 'failed' or 'cancelled'
+        self.result = None
+        self.error = None
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state != 'running'
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.manager.notify(self, force=True)
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def update(self, done=0, failed=0, nbytes=0, total=0, message=None):
+        """Add to the done, failed and byte counters and to the total"""
+        with self.manager.lock:
+            self.done += done
+            self.failed += failed
+            self.bytes += nbytes
+            self.total += total
+            if message is not None:
+                self.message = message
+        self.manager.notify(self)
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+        self.state = 'failed' if error else 'cancelled' if self.is_cancelled() else 'done'
+        self.manager.finish(self)
+
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def rates(self):
+        """Return (items per second, bytes per second) since the job started"""
+        elapsed = max(self.elapsed(), 1e-3)
+        return (self.done + self.failed) / elapsed, self.bytes / elapsed
+
+class JobManager:
+    """Runs bulk operations as concurrent background jobs and tells listeners about their progress"""
+    NOTIFY_INTERVAL = 0.1  # Seconds between progress notifications of a job, starting and finishing always notify
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = []
+        self.listeners = []
+        self.notified_at = {}
+
+    def add(self, title, total=0):
+        """Register a job for work on a thread the caller owns, which reports through the job and calls its finish()"""
+        job = Job(self, title, total)
+        with self.lock:
+            self.jobs.append(job)
+        self.notify(job, force=True)
+        return job
+
+    def submit(self, title, func, total=0, on_done=None):
+        """Run func(job) on a new thread, its return value becomes job.result and an exception job.error.
+        on_done(job) is called on that thread once func is over."""
+        job = self.add(title, total)
+
+        def run():
+            try:
+                result = func(job)
+            except Exception as e:
+                job.finish(error=e)
+            else:
+                job.finish(result)
+            if on_done:
+                on_done(job)
+
+        threading.Thread(target=run, name=f"job: {title}", daemon=True).start()
+        return job
+
+    def finish(self, job):
+        with self.lock:
+            if job in self.jobs:
+                self.jobs.remove(job)
+        self.notify(job, force=True)
+
+    def cancel_all(self):
+        with self.lock:
+            jobs = self.jobs[:]
+        for job in jobs:
+            job.cancel()
+
+    def add_listener(self, callback):
+        """callback(job) is called on the thread reporting whenever a job starts, progresses or finishes"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def notify(self, job, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.notified_at.get(job, 0) < self.NOTIFY_INTERVAL:
+                return
+            if job.finished:
+                self.notified_at.pop(job, None)
+            else:
+                self.notified_at[job] = now
+            listeners = self.listeners[:]
+        for callback in listeners:
+            callback(job)
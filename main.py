@@ -1,8 +1,25 @@
-import replay_viewer
+import sys
+import time
+START_TIME = time.perf_counter()
+
 from multiprocessing import freeze_support, set_start_method
 
+def benchmark_workers():
+    import worker_pool
+    for kind in worker_pool.POOL_SIZES:
+        times = sorted(worker_pool.worker_startup_times(kind).values())
+        print(f"{kind} pool: {len(times)} workers ready in {times[0] * 1000:.0f}-{times[-1] * 1000:.0f} ms")
+    worker_pool.shutdown_pools()
+
 def main():
+    if "--benchmark-workers" in sys.argv:
+        benchmark_workers()
+        return
+    # Imported here so spawned pool workers, which re-import this module, do not load the GUI
+    import replay_viewer
     app = replay_viewer.ReplayViewer(False)
+    if "--benchmark-startup" in sys.argv:
+        app.exit_when_shown(START_TIME)
     app.MainLoop()
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+import os
+import json
+import queue
+import itertools
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+
+import replay_result
+import worker_pool
+import db_common
+
+class ReplayIndexDB:
+    """Parsed metadata of local replays, keyed by path and searchable by content"""
+    def __init__(self):
+        self.conn = sqlite3.connect("replay_index.db")
+        self.cursor = self.conn.cursor()
+        # The GUI searches while the indexer thread writes
+        db_common.configure_connection(self.cursor)
+        self.create_tables()
+
+    def create_tables(self):
+        # summary is NULL for files that could not be parsed, so they are not parsed again until they change.
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS replays (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE,
+            directory TEXT,
+            name TEXT,
+            size INTEGER,
+            mtime REAL,
+            summary TEXT,
+            search_text TEXT
+        )""")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS replays_directory ON replays (directory, name)")
+
+        self.has_fts = db_common.create_trigram_index(self.cursor, 'replays', 'search_text')
+        self.conn.commit()
+
+    def directory_key(self, directory):
+        return os.path.normcase(os.path.abspath(directory))
+
+    def sync_directory(self, directory, entries):
+        """Drop rows of replays no longer in directory and return the (name, size, mtime) entries that need parsing.
+        entries are the (name, size, mtime) of the replays currently in directory."""
+        key = self.directory_key(directory)
+        self.cursor.execute("SELECT id, name, size, mtime FROM replays WHERE directory = ?", (key,))
+        stored = {name: (row_id, size, mtime) for row_id, name, size, mtime in self.cursor.fetchall()}
+        current = {name: (size, mtime) for name, size, mtime in entries}
+
+        # A renamed replay keeps its size and mtime, so its row is moved instead of parsing the file again.
+        # Only a stamp that is unique among both the vanished rows and the new files identifies a rename.
+        vanished = [(row_id, size, mtime) for name, (row_id, size, mtime) in stored.items() if name not in current]
+        vanished_counts = Counter((size, mtime) for _, size, mtime in vanished)
+        new_counts = Counter(stamp for name, stamp in current.items() if name not in stored)
+        renamed = {(size, mtime): row_id for row_id, size, mtime in vanished
+                   if vanished_counts[(size, mtime)] == 1 and new_counts[(size, mtime)] == 1}
+        moved = set()
+        to_parse = []
+        for name, (size, mtime) in current.items():
+            if name in stored:
+                if stored[name][1:] != (size, mtime):
+                    to_parse.append((name, size, mtime))
+                continue
+            row_id = renamed.get((size, mtime))
+            if row_id is None:
+                to_parse.append((name, size, mtime))
+            else:
+                moved.add(row_id)
+                self.cursor.execute("UPDATE replays SET path = ?, name = ? WHERE id = ?",
+                                    (os.path.join(key, os.path.normcase(name)), name, row_id))
+
+        self.cursor.executemany("DELETE FROM replays WHERE id = ?", [(row_id,) for row_id, _, _ in vanished if row_id not in moved])
+        self.conn.commit()
+        return to_parse
+
+    def store_summaries(self, directory, results):
+        """Store (name, size, mtime, summary) parse results of replays in directory"""
+        key = self.directory_key(directory)
+        self.cursor.executemany("""
+            INSERT INTO replays (path, directory, name, size, mtime, summary, search_text) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                name = excluded.name,
+                size = excluded.size,
+                mtime = excluded.mtime,
+                summary = excluded.summary,
+                search_text = excluded.search_text
+        """, [
+            (os.path.join(key, os.path.normcase(name)), key, name, size, mtime,
+             json.dumps(summary) if summary else None, self.search_text(summary))
+            for name, size, mtime, summary in results
+        ])
+        self.conn.commit()
+
+    def search_text(self, summary):
+        """Lowercase text matched by content search: players, factions, map, match type and result"""
+        if not summary:
+            return ""
+        fields = [summary['match_id'], summary['map'], summary['match_type'], summary['match_mode'], summary['result']]
+        for player in summary['players']:
+            fields.extend((player['name'], player['faction'], player['faction_short']))
+        return " ".join(str(field) for field in fields).lower()
+
+    def get_summaries(self, directory, entries=None):
+        """Return {name: summary} of the parsed replays indexed for directory. With entries, the (name, size, mtime)
+        of the replays currently in directory, replays changed since they were indexed are left out"""
+        self.cursor.execute("SELECT name, size, mtime, summary FROM replays WHERE directory = ? AND summary IS NOT NULL",
+                            (self.directory_key(directory),))
+        current = None if entries is None else {name: (size, mtime) for name, size, mtime in entries}
+        return {name: json.loads(summary) for name, size, mtime, summary in self.cursor.fetchall()
+                if current is None or current.get(name) == (size, mtime)}
+
+    def search(self, directory, query):
+        """Return the names of the replays in directory whose content matches every query token"""
+        tokens = list(dict.fromkeys(query.lower().split()))
+        if not tokens:
+            return set()
+
+        fts_tokens, like_tokens = db_common.split_search_tokens(tokens, self.has_fts)
+        clauses = ["directory = ?"]
+        params = [self.directory_key(directory)]
+        if fts_tokens:
+            clauses.append("id IN (SELECT rowid FROM replays_fts WHERE replays_fts MATCH ?)")
+            params.append(" ".join(db_common.fts_phrase(t) for t in fts_tokens))
+        for token in like_tokens:
+            clauses.append("search_text LIKE ? ESCAPE '\\'")
+            params.append(db_common.like_pattern(token))
+
+        self.cursor.execute(f"SELECT name FROM replays WHERE {' AND '.join(clauses)}", params)
+        return {row[0] for row in self.cursor.fetchall()}
+
+def parse_replay_worker(args):
+    """Parse one replay for the index, the summary is None if it is not a valid replay"""
+    path, name, size, mtime = args
+    try:
+        summary = replay_result.ReplayResultParser(path).get_replay_summary()
+    except Exception:
+        summary = None
+    return name, size, mtime, summary
+
+def summarize_replays(summaries):
+    """Aggregate index summaries into games, results per player, faction and map counts and total duration.
+    Replays of the same match recorded by different players count as one game, the copy with a known winner
+    (then the longest one) is used. Games of unknown duration (header-only summaries) are left out of the total."""
+    matches = {}
+    for summary in summaries:
+        key = summary['match_id'] or id(summary)
+        known = summary['winning_team'].isdigit()
+        current = matches.get(key)
+        if current is None or (known, summary['duration_frames'] or 0) > (current['winning_team'].isdigit(), current['duration_frames'] or 0):
+            matches[key] = summary
+
+    players = {}  # name -> [games, wins, losses]
+    factions = Counter()
+    maps = Counter()
+    no_result = 0
+    no_duration = 0
+    duration_frames = 0
+    for summary in matches.values():
+        maps[summary['map']] += 1
+        if summary['duration_frames'] is None:
+            no_duration += 1
+        else:
+            duration_frames += summary['duration_frames']
+        winning_team = summary['winning_team']
+        if not winning_team.isdigit():
+            no_result += 1
+        for player in summary['players']:
+            if player['faction'] == 'Observer':
+                continue
+            factions[player['faction']] += 1
+            stats = players.setdefault(player['name'], [0, 0, 0])
+            stats[0] += 1
+            if winning_team.isdigit():
+                stats[1 if str(player['team']) == winning_team else 2] += 1
+    return {
+        'games': len(matches),
+        'no_result': no_result,
+        'no_duration': no_duration,
+        'duration_frames': duration_frames,
+        'players': players,
+        'factions': factions,
+        'maps': maps,
+    }
+
+class ReplayIndexer(threading.Thread):
+    """Parses the replays of opened directories in the background and keeps replay_index.db current"""
+    BATCH_SIZE = 200  # Parse results written per transaction
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.queue = queue.Queue()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.priority = (None, [])  # (directory, names) to parse before the rest of that directory
+
+    def index_directory(self, directory, entries):
+        """Queue directory for indexing, entries are the (name, size, mtime) of the replays in it"""
+        self.queue.put((directory, entries))
+
+    def prioritize(self, directory, names):
+        """Parse these replays of directory next, typically the rows currently on screen"""
+        with self.lock:
+            self.priority = (directory, list(names))
+
+    def stop(self):
+        self.stopping.set()
+        self.queue.put(None)
+
+    def add_listener(self, callback):
+        """callback(directory, done, total, summaries) is called on the indexer thread as parse results are committed,
+        summaries are the {name: summary} of the replays just parsed"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def notify_listeners(self, directory, done, total, summaries=None):
+        with self.lock:
+            listeners = self.listeners[:]
+        for callback in listeners:
+            callback(directory, done, total, summaries or {})
+
+    def run(self):
+        db = ReplayIndexDB()
+        work = OrderedDict()  # directory -> [pending entries by name, done, total], most recently opened last
+        while not self.stopping.is_set():
+            requests = {}
+            block = not work
+            # Only the latest listing of a directory matters when it was reloaded meanwhile.
+            while True:
+                try:
+                    item = self.queue.get(block=block)
+                except queue.Empty:
+                    break
+                if item is None:
+                    db.conn.close()
+                    return
+                directory, entries = item
+                requests.pop(directory, None)
+                requests[directory] = entries
+                block = False
+            for directory, entries in requests.items():
+                try:
+                    self.start_directory(db, work, directory, entries)
+                except Exception as e:
+                    print(f"Error indexing replays in {directory}: {e}")
+            if not work:
+                continue
+            # One batch at a time, so a newly opened directory does not wait for the previous one to be parsed
+            # completely. Directories left behind resume once nothing newer is pending.
+            directory = self.next_directory(work)
+            try:
+                self.index_batch(db, work, directory)
+            except Exception as e:
+                print(f"Error indexing replays in {directory}: {e}")
+                del work[directory]
+        db.conn.close()
+
+    def start_directory(self, db, work, directory, entries):
+        pending = {name: (name, size, mtime) for name, size, mtime in db.sync_directory(directory, entries)}
+        work.pop(directory, None)
+        if pending:
+            work[directory] = [pending, 0, len(pending)]
+        self.notify_listeners(directory, 0, len(pending))
+
+    def next_directory(self, work):
+        """The directory with prioritized replays if it still has work, otherwise the most recently opened one"""
+        with self.lock:
+            priority_directory = self.priority[0]
+        if priority_directory in work:
+            return priority_directory
+        return next(reversed(work))
+
+    def index_batch(self, db, work, directory):
+        state = work[directory]
+        pending = state[0]
+        batch, prioritized = self.next_batch(directory, pending)
+        args = [(os.path.join(directory, name), name, size, mtime) for name, size, mtime in batch]
+        # Prioritized batches are small, one replay per task spreads them over every worker
+        results = list(worker_pool.imap_unordered('cpu', parse_replay_worker, args, chunksize=1 if prioritized else 8,
+                                                  cancel=self.stopping))
+        if self.stopping.is_set():
+            return
+        db.store_summaries(directory, results)
+        state[1] += len(results)
+        if not pending:
+            del work[directory]
+        self.notify_listeners(directory, state[1], state[2], {name: summary for name, _, _, summary in results if summary})
+
+    def next_batch(self, directory, pending):
+        """Take the next replays to parse out of pending, the prioritized ones first. Returns (entries, prioritized)"""
+        with self.lock:
+            priority_directory, names = self.priority
+        prioritized = priority_directory == directory and [name for name in names if name in pending][:self.BATCH_SIZE]
+        if not prioritized:
+            names = list(itertools.islice(pending, self.BATCH_SIZE))
+        return [pending.pop(name) for name in prioritized or names], bool(prioritized)
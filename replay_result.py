@@ -5,16 +5,20 @@ import struct
 from io import BytesIO
 import hashlib
 
-import requests
-
 import prng
 from version_config import version_config
 
 class ReplayResultParser:
-    def __init__(self, file_path, file_location='local'):
+    def __init__(self, file_path, file_location='local', data=None, header_only=False):
+        """data can hold the replay bytes when they were already read or downloaded by the caller.
+        With header_only, data may be just the start of the replay: match data, players and teams are
+        parsed but the result is not analysed. The duration is then only known for normal replays, whose
+        header records it."""
         self.is_genrep = True
+        self.header_only = header_only
         self.file_path = file_path
         self.file_location = file_location
+        self.data = data
 
         self.header, self.body = self.get_replay_data()
         
@@ -39,6 +43,11 @@ class ReplayResultParser:
             self.replay_player_num = self.match_data['replay_player_num']
             self.players = self.match_data['players']
             self.teams = self.match_data['teams']
+
+            if header_only:
+                self.match_result = ""
+                self.winning_team_string = ""
+                return
             
             # Store players self destruct message indices
             self.player_quit_idxs = self.extract_self_destruct_idxs()
@@ -151,6 +160,27 @@ class ReplayResultParser:
 
             return replay_info
 
+    def get_replay_summary(self):
+        """Match metadata used by the replay index, as a json serializable dict"""
+        if self.is_genrep:
+            players = []
+            for data in self.players.values():
+                faction = self.factions.get(data['faction'], ['Unknown', 'Unknown'])
+                players.append({'name': data['name'], 'faction': faction[0], 'faction_short': faction[1], 'team': data['team']})
+
+            return {
+                'match_id': self.get_match_id(),
+                'start_time': self.header['begin_timestamp'],
+                'map': self.get_map_name(),
+                'match_type': self.match_data['match_type'],
+                'match_mode': self.get_match_mode(),
+                'duration_frames': self.match_data['end_frame'],
+                'player_name': self.players[self.replay_player_num]['name'],
+                'players': players,
+                'winning_team': self.winning_team_string,
+                'result': self.match_result,
+            }
+
     def get_map_name(self):
         map_name = self.match_data.get('M', 'Unknown')
         return map_name[map_name.rfind('/')+1:] if map_name != 'Unknown' else 'Unknown'
@@ -879,10 +909,14 @@ class ReplayResultParser:
     def get_replay_data(self):
         header = {}
         body = ''
-        if self.file_location=='local':
+        if self.data is not None:
+            with BytesIO(self.data) as file_handle:
+                header, body = self.parse_replay_data(file_handle)
+        elif self.file_location=='local':
             with open(self.file_path, 'rb') as file_handle:
                 header, body = self.parse_replay_data(file_handle)
         elif self.file_location=='online':
+            import requests  # Only loaded once an online replay is read
             try:
                 response = requests.get(self.file_path)
                 response.raise_for_status()
@@ -1127,7 +1161,9 @@ class ReplayResultParser:
             match_data['S'] = slot_data
         match_data['replay_player_num'], match_data['player_num_offset'], match_data['is_normal_rep'] = self.get_pl_num_offset(self.header['local_player_index'], match_data['S'])
         match_data['end_frame'] = self.header['total_frames']
-        if not match_data['is_normal_rep']:
+        if not match_data['is_normal_rep'] and self.header_only:
+            match_data['end_frame'] = None  # Found in the last messages, which a header fetch does not have
+        elif not match_data['is_normal_rep']:
             last_messages = re.findall(r"00....00000.0000000", self.body[-10000:])
             if len(last_messages) >= 1:
                 for msg in reversed(last_messages):
@@ -1,30 +1,233 @@
 import os
 import time
 import shutil
-import re
-from datetime import datetime, timezone, timedelta, date
-import sqlite3
-from urllib.parse import unquote, quote
-from multiprocessing import Pool
+import heapq
+from datetime import datetime, timezone, timedelta
+from urllib.parse import unquote
 import threading
+from collections import OrderedDict, deque
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 
 import wx
 import wx.adv
-import requests
-from bs4 import BeautifulSoup
+# requests and bs4 are imported where they are first needed, so they stay out of the startup path of
+# local-only sessions.
 
 import replay_result
+import replay_index
+import worker_pool
+import jobs
+from directory_db import UserDirectoryDB, DirectoryDBWriter
+# Pool tasks live in the GUI-free workers module, spawned workers never import wx
+from workers import (get_directories_worker, get_dir_files_worker, download_reps_worker, get_new_name_worker,
+                     get_replay_header_worker, download_replay, plan_renames, GENTOOL_BASE_URL)
 from version_config import version_config
 
+class ListModel:
+    """Rows shown by a virtual SortableListCtrl, with typed sort keys cached per column"""
+    def __init__(self, numeric_cols=()):
+        self.numeric_cols = set(numeric_cols)
+        self.clear()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def clear(self):
+        self.texts = []
+        self.types = []
+        self.colours = {}
+        self.sort_keys = {}
+        self.string_cols = set()
+
+    def add_rows(self, rows):
+        """Append (texts, item_type) rows"""
+        start = len(self.texts)
+        for texts, item_type in rows:
+            self.texts.append(tuple(str(text) for text in texts))
+            self.types.append(item_type)
+        # Extend the cached keys instead of dropping them, so appending stays cheap.
+        for col in list(self.sort_keys):
+            try:
+                self.sort_keys[col].extend(self.column_key(col, self.get_text(row, col)) for row in range(start, len(self.texts)))
+            except ValueError:
+                del self.sort_keys[col]  # Rebuilt with the string fallback on the next sort
+
+    def get_text(self, row, col):
+        texts = self.texts[row]
+        return texts[col] if col < len(texts) else ""
+
+    def get_type(self, row):
+        return self.types[row]
+
+    def get_colour(self, row):
+        return self.colours.get(row)
+
+    def set_colour(self, row, colour):
+        self.colours[row] = colour
+
+    def set_texts(self, row, start, texts):
+        """Replace the texts of row from column start on"""
+        self.texts[row] = self.texts[row][:start] + ("",) * (start - len(self.texts[row])) + tuple(str(text) for text in texts)
+        for col in range(start, start + len(texts)):
+            self.sort_keys.pop(col, None)
+
+    def column_key(self, col, text):
+        if col in self.numeric_cols and col not in self.string_cols:
+            return float(text or 0)
+        return text.lower()
+
+    def get_sort_keys(self, col):
+        keys = self.sort_keys.get(col)
+        if keys is None:
+            try:
+                keys = [self.column_key(col, self.get_text(row, col)) for row in range(len(self.texts))]
+            except ValueError:
+                # Fallback to string sorting if numeric conversion fails
+                self.string_cols.add(col)
+                keys = [self.column_key(col, self.get_text(row, col)) for row in range(len(self.texts))]
+            self.sort_keys[col] = keys
+        return keys
+
+class OnlineCatalog:
+    """ListModel of online browse results. Directory URL prefixes are interned and sizes and dates are kept
+    in typed arrays, so months of busy directories fit in a few bytes per file besides its name"""
+    DATE_FORMAT = "%Y-%m-%d %H:%M"  # Dates as listed by Gentool
+    ARRAY_KEY_COLS = (1, 2)  # Sort keys of these columns are the typed arrays themselves
+    METADATA_COLS = (5, 6, 7, 8)  # Map, match type, players and match id, filled in as replay headers are fetched
+
+    def __init__(self):
+        self.clear()
+
+    def __len__(self):
+        return len(self.names)
+
+    def clear(self):
+        self.names = []
+        self.sizes = array('d')  # KB
+        self.times = array('q')  # Seconds since the epoch, UTC
+        self.types = array('b')
+        self.directories = array('l')  # Index into self.prefixes
+        self.prefixes = []  # (user dir, URL prefix) of each directory
+        self.prefix_keys = []  # Lowercase user dir of each directory, for sorting
+        self.prefix_index = {}
+        self.overrides = {}  # (row, col) -> text the compact columns can not reproduce
+        self.metadata = {}  # row -> metadata column texts, None if the replay header could not be read
+        self.metadata_texts = {}  # row -> lowercase metadata, for search
+        self.colours = {}
+        self.sort_keys = {}
+
+    def add_rows(self, rows):
+        """Append ((name, size, date, user dir, url), item_type) rows as returned by get_dir_files_worker"""
+        start = len(self.names)
+        for (name, size, date_str, user_dir, url), item_type in rows:
+            row = len(self.names)
+            self.names.append(name)
+            self.sizes.append(float(size))
+            self.types.append(item_type)
+            # Only dates in exactly DATE_FORMAT are stored as timestamps, anything else is kept as text
+            timestamp = 0
+            if len(date_str) == 16 and date_str[10] == " ":
+                try:
+                    timestamp = int(datetime.fromisoformat(date_str).replace(tzinfo=timezone.utc).timestamp())
+                except ValueError:
+                    pass
+            self.times.append(timestamp)
+            if not timestamp:
+                self.overrides[(row, 2)] = date_str
+            if url.endswith(name):
+                prefix = url[:len(url) - len(name)]
+            else:
+                prefix = ""
+                self.overrides[(row, 4)] = url
+            self.directories.append(self.intern_prefix(user_dir, prefix))
+        for col, keys in self.sort_keys.items():
+            if col not in self.ARRAY_KEY_COLS:
+                keys.extend(self.column_keys(col, start, len(self.names)))
+
+    def intern_prefix(self, user_dir, prefix):
+        index = self.prefix_index.get((user_dir, prefix))
+        if index is None:
+            index = self.prefix_index[(user_dir, prefix)] = len(self.prefixes)
+            self.prefixes.append((user_dir, prefix))
+            self.prefix_keys.append(user_dir.lower())
+        return index
+
+    def format_time(self, timestamp):
+        return datetime.fromtimestamp(timestamp, timezone.utc).strftime(self.DATE_FORMAT)
+
+    def get_text(self, row, col):
+        text = self.overrides.get((row, col))
+        if text is not None:
+            return text
+        if col == 0:
+            return self.names[row]
+        if col == 1:
+            return str(self.sizes[row])
+        if col == 2:
+            return self.format_time(self.times[row])
+        if col == 3:
+            return self.prefixes[self.directories[row]][0]
+        if col == 4:
+            return self.prefixes[self.directories[row]][1] + self.names[row]
+        if col in self.METADATA_COLS:
+            values = self.metadata.get(row)
+            return values[col - self.METADATA_COLS[0]] if values else ""
+        return ""
+
+    def set_metadata(self, row, values):
+        self.metadata[row] = values
+        if values:
+            self.metadata_texts[row] = " ".join(values).lower()
+        for col in self.METADATA_COLS:
+            self.sort_keys.pop(col, None)  # Rebuilt with the new values on the next sort
+
+    def metadata_text(self, row):
+        return self.metadata_texts.get(row, "")
+
+    def get_type(self, row):
+        return self.types[row]
+
+    def get_colour(self, row):
+        return self.colours.get(row)
+
+    def set_colour(self, row, colour):
+        self.colours[row] = colour
+
+    def column_keys(self, col, start, end):
+        if col == 0:
+            return [name.lower() for name in self.names[start:end]]
+        if col == 3:
+            return [self.prefix_keys[index] for index in self.directories[start:end]]
+        return [self.get_text(row, col).lower() for row in range(start, end)]
+
+    def get_sort_keys(self, col):
+        if col == 1:
+            return self.sizes
+        if col == 2:
+            return self.times
+        keys = self.sort_keys.get(col)
+        if keys is None:
+            keys = self.sort_keys[col] = self.column_keys(col, 0, len(self.names))
+        return keys
+
 class SortableListCtrl(wx.ListCtrl):
-    def __init__(self, parent, columns, style=wx.LC_REPORT | wx.BORDER_SUNKEN, with_icons=False, force_string_sort_cols=None):
-        super().__init__(parent, style=style)
+    """Virtual list control, items are never rebuilt: sorting and display only permute self.view over the model"""
+    def __init__(self, parent, columns, style=wx.LC_REPORT | wx.BORDER_SUNKEN, with_icons=False, force_string_sort_cols=None, model=None):
+        super().__init__(parent, style=style | wx.LC_VIRTUAL)
         self.columns = columns
         self.sort_column = -1
         self.sort_ascending = True
         self.with_icons = with_icons
-        self.item_colors = {}
         self.force_string_sort_cols = force_string_sort_cols or []  # Columns to always sort as strings
+        # The size column of file lists sorts numerically, everything else as lowercase strings
+        if model is None:
+            model = ListModel([col for col in [1] if with_icons and col not in self.force_string_sort_cols])
+        self.model = model
+        self.view = []  # Model row shown at each list index
+        self.filter_func = None
+        self.restoring_selection = False  # Set while set_view reselects rows, selection handlers ignore those events
+        self.attr_cache = {}
         
         if self.with_icons:
             self.image_list = wx.ImageList(16, 16)
@@ -40,7 +243,122 @@ class SortableListCtrl(wx.ListCtrl):
     def setup_columns(self):
         for idx, (header, width) in enumerate(self.columns):
             self.InsertColumn(idx, header, width=width)
-    
+
+    def OnGetItemText(self, item, col):
+        return self.model.get_text(self.view[item], col)
+
+    def OnGetItemImage(self, item):
+        if not self.with_icons:
+            return -1
+        row = self.view[item]
+        if self.model.get_type(row) in (0, 1):  # Parent or folder
+            return self.folder_idx
+        return self.rep_file_idx if self.model.get_text(row, 0).lower().endswith('.rep') else self.file_idx
+
+    def OnGetItemAttr(self, item):
+        colour = self.model.get_colour(self.view[item])
+        if colour is None:
+            return None
+        attr = self.attr_cache.get(colour)
+        if attr is None:
+            attr = self.attr_cache[colour] = wx.ItemAttr()
+            attr.SetTextColour(wx.Colour(colour))
+        return attr
+
+    def GetItemText(self, item, col=0):
+        return self.model.get_text(self.view[item], col)
+
+    def GetItemData(self, item):
+        return self.model.get_type(self.view[item])
+
+    def SetItemTextColour(self, item, colour):
+        self.model.set_colour(self.view[item], wx.Colour(colour).GetAsString(wx.C2S_HTML_SYNTAX))
+        self.RefreshItem(item)
+
+    def DeleteAllItems(self):
+        """Remove all rows and any filter, the sort column is kept for the next rows"""
+        self.model.clear()
+        self.view = []
+        self.filter_func = None
+        super().DeleteAllItems()
+
+    def set_rows(self, rows):
+        """Replace the contents of the list with (texts, item_type) rows"""
+        self.DeleteAllItems()
+        self.model.add_rows(rows)
+        self.rebuild_view()
+
+    def set_filter(self, predicate, narrow=False):
+        """Only show the model rows for which predicate(row) is true, None shows every row.
+        With narrow, predicate only rejects rows of the current filter, so just the shown rows are tested"""
+        self.filter_func = predicate
+        if narrow and predicate:
+            self.set_view([row for row in self.view if predicate(row)])
+        else:
+            self.rebuild_view()
+
+    def append_rows(self, rows):
+        """Append (texts, item_type) rows, keeping the current sort order and filter.
+        Only the new rows are sorted, then merged into the sorted view"""
+        start = len(self.model)
+        keys = self.model.get_sort_keys(self.sort_column) if self.sort_column >= 0 else None
+        self.model.add_rows(rows)
+        new_rows = range(start, len(self.model))
+        if self.filter_func:
+            new_rows = [row for row in new_rows if self.filter_func(row)]
+        if self.sort_column < 0:
+            self.view.extend(new_rows)
+            self.SetItemCount(len(self.view))
+        elif self.model.get_sort_keys(self.sort_column) is not keys:
+            self.rebuild_view()  # The column fell back to string sorting
+        elif new_rows:
+            self.set_view(self.merge_rows(self.view, self.sorted_rows(new_rows, self.sort_column, self.sort_ascending)))
+
+    def add_row(self, texts, item_type=None):
+        """Append a single row and return its list index"""
+        self.append_rows([(texts, item_type)])
+        return self.view.index(len(self.model) - 1)
+
+    def rebuild_view(self):
+        rows = range(len(self.model))
+        if self.filter_func:
+            rows = [row for row in rows if self.filter_func(row)]
+        if self.sort_column >= 0:
+            rows = self.sorted_rows(rows, self.sort_column, self.sort_ascending)
+        self.set_view(list(rows))
+
+    def set_view(self, view):
+        """Show the given model rows, keeping the selection on the same rows. Rows that are no longer shown
+        are reported with a single deselection event"""
+        selected_rows = set(self.get_selected_rows())
+        kept = 0
+        self.restoring_selection = True
+        try:
+            if selected_rows:
+                self.SetItemState(-1, 0, wx.LIST_STATE_SELECTED)
+            self.view = view
+            self.SetItemCount(len(view))
+            if selected_rows:
+                for index, row in enumerate(view):
+                    if row in selected_rows:
+                        self.SetItemState(index, wx.LIST_STATE_SELECTED, wx.LIST_STATE_SELECTED)
+                        kept += 1
+        finally:
+            self.restoring_selection = False
+        self.Refresh()
+        if kept < len(selected_rows):
+            event = wx.ListEvent(wx.wxEVT_LIST_ITEM_DESELECTED, self.GetId())
+            event.SetEventObject(self)
+            self.GetEventHandler().ProcessEvent(event)
+
+    def get_selected_rows(self):
+        rows = []
+        index = self.GetFirstSelected()
+        while index != -1:
+            rows.append(self.view[index])
+            index = self.GetNextSelected(index)
+        return rows
+
     def on_column_click(self, event):
         column = event.GetColumn()
         
@@ -51,110 +369,41 @@ class SortableListCtrl(wx.ListCtrl):
             self.sort_ascending = True
         
         self.sort_items(column, self.sort_ascending)
-    
-    def SetItemTextColour(self, item, colour):
-            super().SetItemTextColour(item, colour)
-            self.item_colors[item] = colour
 
     def sort_items(self, column, ascending):
-        items = []
-        for i in range(self.GetItemCount()):
-            item_data = [self.GetItemText(i, col) for col in range(len(self.columns))]
-            item_type = self.GetItemData(i) if self.with_icons else None
-            item_color = self.item_colors.get(i) if hasattr(self, 'item_colors') else None
-            items.append((item_data, item_type, item_color))
-        
-        if not items:
+        self.sort_column = column
+        self.sort_ascending = ascending
+        if not self.view:
             return
-        
-        try:
-            # Determine if we should force string sorting for this column
-            force_string = column in self.force_string_sort_cols
-            
-            # For file lists: separate folders and files
-            if self.with_icons:
-                parent_dir = []
-                folders = []
-                files = []
-                
-                for item in items:
-                    if item[1] == 0:
-                        parent_dir.append(item)
-                    elif item[1] == 1:
-                        folders.append(item)
-                    else:
-                        files.append(item)
-                
-                # Sort folders and files separately
-                sort_key = lambda x: x[0][column].lower() if force_string or column != 1 else float(x[0][column] or 0)
-                
-                folders.sort(key=sort_key, reverse=not ascending)
-                files.sort(key=sort_key, reverse=not ascending)
-                
-                sorted_items = parent_dir + folders + files
-            else:
-                # For other lists (like properties_list)
-                sort_key = lambda x: x[0][column].lower()  # Always sort as string for properties_list
-                sorted_items = sorted(items, key=sort_key, reverse=not ascending)
-            
-            # Reload sorted items (same as before)
-            self.DeleteAllItems()
-
-            self.item_colors = {}
-            
-            for new_index, (item_data, item_type, item_color) in enumerate(sorted_items):
-                if self.with_icons:
-                   if item_type == 0:  # Parent
-                       index = self.InsertItem(self.GetItemCount(), item_data[0], self.folder_idx)
-                   elif item_type == 1:  # Folder
-                       index = self.InsertItem(self.GetItemCount(), item_data[0], self.folder_idx)
-                   else:  # File
-                       icon = self.rep_file_idx if item_data[0].lower().endswith('.rep') else self.file_idx
-                       index = self.InsertItem(self.GetItemCount(), item_data[0], icon)
-                else:
-                    index = self.InsertItem(self.GetItemCount(), item_data[0])
-                
-                # Set other columns
-                for col in range(1, len(item_data)):
-                    self.SetItem(index, col, item_data[col])
-                
-                # Restore color if it existed
-                if item_color is not None:
-                    super().SetItemTextColour(index, item_color)
-                    self.item_colors[index] = item_color
-                
-                # Store item type if using icons
-                if self.with_icons:
-                    self.SetItemData(index, item_type)
-        
-        except ValueError:
-            # Fallback to string sorting if numeric conversion fails
-            if self.with_icons:
-                folders.sort(key=lambda x: x[0][column].lower(), reverse=not ascending)
-                files.sort(key=lambda x: x[0][column].lower(), reverse=not ascending)
-                sorted_items = parent_dir + folders + files
-            else:
-                sorted_items = sorted(items, key=lambda x: x[0][column].lower(), reverse=not ascending)
-            
-            self.DeleteAllItems()
-            for item_data, item_type in sorted_items:
-                if self.with_icons:
-                    if item_type == 0:
-                        index = self.InsertItem(self.GetItemCount(), item_data[0], self.folder_idx)
-                    elif item_type == 1:
-                        index = self.InsertItem(self.GetItemCount(), item_data[0], self.folder_idx)
-                    else:
-                        icon = self.rep_file_idx if item_data[0].lower().endswith('.rep') else self.file_idx
-                        index = self.InsertItem(self.GetItemCount(), item_data[0], icon)
-                else:
-                    index = self.InsertItem(self.GetItemCount(), item_data[0])
-                
-                for col in range(1, len(item_data)):
-                    self.SetItem(index, col, item_data[col])
-                
-                if self.with_icons:
-                    self.SetItemData(index, item_type)
+        self.set_view(self.sorted_rows(self.view, column, ascending))
+
+    def sorted_rows(self, rows, column, ascending):
+        keys = self.model.get_sort_keys(column)
+        rows = sorted(rows, key=keys.__getitem__, reverse=not ascending)
+        if not self.with_icons:
+            return rows
+        # For file lists: parent directory first, then folders and files sorted separately
+        get_type = self.model.get_type
+        return ([row for row in rows if get_type(row) == 0] +
+                [row for row in rows if get_type(row) == 1] +
+                [row for row in rows if get_type(row) not in (0, 1)])
     
+    def merge_rows(self, view, new_rows):
+        """Merge sorted new_rows into the sorted view in linear time, existing rows stay before equal new ones"""
+        keys = self.model.get_sort_keys(self.sort_column)
+        reverse = not self.sort_ascending
+        if not self.with_icons:
+            return list(heapq.merge(view, new_rows, key=keys.__getitem__, reverse=reverse))
+        # Parent, folders and files are merged separately to keep them grouped
+        get_type = self.model.get_type
+        group_of = lambda row: {0: 0, 1: 1}.get(get_type(row), 2)
+        merged = []
+        for group in range(3):
+            merged.extend(heapq.merge([row for row in view if group_of(row) == group],
+                                      [row for row in new_rows if group_of(row) == group],
+                                      key=keys.__getitem__, reverse=reverse))
+        return merged
+
     def on_right_click(self, event):
         index = event.GetIndex()
         if index != -1:
@@ -168,13 +417,26 @@ class SortableListCtrl(wx.ListCtrl):
             self.PopupMenu(menu)
     
     def on_copy(self, row, col):
-        text = self.GetItem(row, col).Text
+        text = self.GetItemText(row, col)
         clipboard = wx.Clipboard.Get()
         if clipboard.Open():
             clipboard.SetData(wx.TextDataObject(text))
             clipboard.Close()
 
 class ReplayBrowserTab(wx.Panel):
+    LOAD_BATCH_SIZE = 500  # Rows added to the file list per GUI event while loading a directory
+    SEARCH_DELAY_MS = 250  # Typing pause before the file list is filtered
+    PREVIEW_DELAY_MS = 150  # Selection pause before the selected replay is parsed
+    PREVIEW_WORKERS = 2
+    PREFETCH_ROWS = 3  # Rows before and after the previewed one that are parsed ahead of time
+    PREVIEW_CACHE_SIZE = 64  # Parsed replays kept in memory for instant previews
+    REQUEUE_ROUNDS = 2  # Extra passes over transiently failed fetches before they are reported
+    METADATA_BATCH = 32  # Replay headers fetched per pass, the queue order is re-read between passes
+    METADATA_POLL_MS = 300  # Interval at which the scroll position is checked to fetch visible rows first
+    SUMMARY_COLUMN = 3  # First of the local columns filled from the replay index
+    SELECTION_DELAY_MS = 200  # Selection pause before a multi-selection is summarized
+    SELECTION_REFRESH_SECONDS = 0.25  # Interval at which a running selection summary is redrawn
+
     def __init__(self, parent, tab_type="local"):
         super().__init__(parent)
         self.tab_type = tab_type
@@ -184,8 +446,38 @@ class ReplayBrowserTab(wx.Panel):
         self.sort_column = -1
         self.sort_ascending = True
         self.fetch_id = 0
+        self.load_id = 0
+        self.search_text = ""
+        self.search_timer = None
+        self.jobs = wx.GetApp().jobs
+        self.selection_summaries = {}  # path or url -> summary (None if unreadable) of replays selected together
+        self.selection_paths = []  # Selected replays of the summary shown
+        self.selection_keys = set()
+        self.selection_id = 0
+        self.selection_job = None
+        self.selection_timer = None
+        self.preview_executor = ThreadPoolExecutor(max_workers=self.PREVIEW_WORKERS, thread_name_prefix="preview")
+        self.preview_cancel = threading.Event()
+        self.preview_future = None
+        self.preview_timer = None
+        self.preview_row = None  # Model row of the previewed replay, its list index changes as the view is re-sorted
+        # A single worker keeps prefetching from competing with the preview executor for the CPU and network
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.prefetch_cancel = threading.Event()
+        self.preview_cache = OrderedDict()  # path or url -> (file stamp, (file_prop, player_info)), least recently used first
+        self.preview_cache_lock = threading.Lock()
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
         self.setup_ui()
         if tab_type == "local":
+            self.replay_index = replay_index.ReplayIndexDB()
+            self.index_progress = (0, 0)
+            self.file_rows = {}  # Filename -> model row of the listed directory
+            self.summarized = set()  # Filenames whose parsed columns are shown
+            self.summary_visible = None  # Visible rows last sent to the indexer
+            self.summary_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self.on_summary_timer, self.summary_timer)
+            self.replay_indexer = wx.GetApp().replay_indexer
+            self.replay_indexer.add_listener(self.on_index_progress)
             replays_dir = os.path.join(os.environ['USERPROFILE'], 'Documents\\Command and Conquer Generals Zero Hour Data\\Replays')
             if os.path.isdir(replays_dir):
                 self.load_directory(replays_dir)
@@ -194,7 +486,17 @@ class ReplayBrowserTab(wx.Panel):
         if tab_type == "online":
             self.current_directories = []
             self.directories_to_fetch = []
-            self.all_files = []
+            self.directory_db = None  # Opened on the first browse
+            self.fetch_jobs = []  # Listing jobs of the current browse
+            self.metadata_queue = deque()  # Model rows waiting for their replay header, visible rows first
+            self.metadata_lock = threading.Lock()
+            self.metadata_wake = threading.Event()
+            self.metadata_stop = threading.Event()
+            self.metadata_generation = 0  # Incremented when the listed replays are replaced
+            self.metadata_thread = None
+            self.metadata_view = None  # (top item, view, row count) the queue was last ordered for
+            self.metadata_timer = wx.Timer(self)
+            self.Bind(wx.EVT_TIMER, self.on_metadata_timer, self.metadata_timer)
 
             self.setup_online_controls()
     
@@ -226,7 +528,15 @@ class ReplayBrowserTab(wx.Panel):
         self.search_ctrl.SetDescriptiveText("Search files...")
         self.search_ctrl.Bind(wx.EVT_TEXT, self.on_search)
         self.search_ctrl.Bind(wx.EVT_SEARCH_CANCEL, self.on_search_cancel)
-        left_vbox.Add(self.search_ctrl, proportion=0, flag=wx.EXPAND | wx.LEFT | wx.BOTTOM, border=2)
+        search_hbox = wx.BoxSizer(wx.HORIZONTAL)
+        search_hbox.Add(self.search_ctrl, proportion=1, flag=wx.EXPAND)
+        if self.tab_type == "local":
+            # Content search matches players, factions, map, match type and result from the replay index
+            self.search_mode = wx.Choice(left_panel, choices=["Filename", "Content"])
+            self.search_mode.SetSelection(0)
+            self.search_mode.Bind(wx.EVT_CHOICE, self.on_search_mode)
+            search_hbox.Add(self.search_mode, flag=wx.LEFT, border=2)
+        left_vbox.Add(search_hbox, proportion=0, flag=wx.EXPAND | wx.LEFT | wx.BOTTOM, border=2)
         
         # File count label
         self.file_count_label = wx.StaticText(left_panel, label="")
@@ -234,10 +544,13 @@ class ReplayBrowserTab(wx.Panel):
         
         # File list
         if self.tab_type == "local":
-            file_list_columns = [("Filename", 200), ("File Size (KB)", 50), ("Date Modified", 150)]
+            file_list_columns = [("Filename", 200), ("File Size (KB)", 50), ("Date Modified", 150),
+                                 ("Map", 120), ("Match Type", 70), ("Players", 250), ("Result", 150), ("Duration", 70)]
         elif self.tab_type == "online":
-            file_list_columns = [("Filename", 200), ("File Size (KB)", 50), ("Date Modified", 150), ("GT Dir", 150), ("URL", 150)]
-        self.file_list = SortableListCtrl(left_panel, file_list_columns, with_icons=True)
+            file_list_columns = [("Filename", 200), ("File Size (KB)", 50), ("Date Modified", 150), ("GT Dir", 150), ("URL", 150),
+                                 ("Map", 120), ("Match Type", 70), ("Players", 250), ("Match ID", 100)]
+        model = OnlineCatalog() if self.tab_type == "online" else None
+        self.file_list = SortableListCtrl(left_panel, file_list_columns, with_icons=True, model=model)
         self.file_list.SetMinSize((300, -1))
 
         self.file_list.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_file_selected)
@@ -322,71 +635,114 @@ class ReplayBrowserTab(wx.Panel):
         self.properties_list.SetFont(font)
         self.details_list.SetFont(font)
 
-    def load_directory(self, directory_path):
+    def load_directory(self, directory_path, on_loaded=None):
+        """Start listing directory_path on a background thread, rows are added in batches as they are ready"""
         if self.tab_type != "local":
             return
             
         self.dir_path.SetPath(directory_path)
         self.current_directory = directory_path
         self.file_list.DeleteAllItems()
-        
+        self.action_all_btn.Disable()
+
+        self.load_id += 1  # Invalidate previous load
+        self.cancel_selection_summary()
+        self.selection_summaries = {}
+        self.index_progress = (0, 0)
+        self.file_rows = {}
+        self.summarized = set()
+        self.summary_visible = None
+        self.summary_timer.Start(self.METADATA_POLL_MS)
+        
+        # Add parent directory if not at root
+        if os.path.abspath(directory_path) != os.path.abspath(os.path.dirname(directory_path)):
+            self.file_list.add_row(("..", "", ""), 0)  # 0 for parent directory
+
+        # Keep the current search applied to the rows as they arrive
+        self.search_text = ""
+        self.filter_files(self.search_ctrl.GetValue().lower())
+        self.file_count_label.SetLabel("Loading...")
+
+        threading.Thread(target=self.scan_directory, args=(directory_path, self.load_id, on_loaded), daemon=True).start()
+
+    def scan_directory(self, directory_path, load_id, on_loaded):
+        """List a directory on a worker thread, reusing the type and stat data os.scandir returns with each entry"""
+        directories = []
+        files = []
+        index_entries = []  # (name, size, mtime) of the replays, for the content index
         try:
-            # Add parent directory if not at root
-            if os.path.abspath(directory_path) != os.path.abspath(os.path.dirname(directory_path)):
-                index = self.file_list.InsertItem(0, "..", self.file_list.folder_idx)
-                self.file_list.SetItem(index, 1, "")
-                self.file_list.SetItem(index, 2, "")
-                self.file_list.SetItemData(index, 0)  # 0 for parent directory
-
-            items = os.listdir(directory_path)
-            directories = []
-            files = []
-            
-            for item in items:
-                item_path = os.path.join(directory_path, item)
-                if os.path.isdir(item_path):
-                    directories.append(item)
-                elif not self.filter_bin_only or item.lower().endswith('.rep'):
-                    files.append(item)
-            
-            directories.sort()
-            files.sort()
-            
-            if files:
-                self.action_all_btn.Enable()
-            else:
-                self.action_all_btn.Disable()
-            
-            # Add directories with type=1
-            for directory in directories:
-                dir_path = os.path.join(directory_path, directory)
-                index = self.file_list.InsertItem(self.file_list.GetItemCount(), directory, self.file_list.folder_idx)
-                self.file_list.SetItem(index, 1, "")
-                mod_time = os.path.getmtime(dir_path)
-                date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mod_time))
-                self.file_list.SetItem(index, 2, date_str)
-                self.file_list.SetItemData(index, 1)  # 1 for folder
-            
-            # Add files with type=2
-            for file in files:
-                file_path = os.path.join(directory_path, file)
-                # Determine icon based on file extension
-                icon_idx = self.file_list.rep_file_idx if file.lower().endswith('.rep') else self.file_list.file_idx
-                
-                index = self.file_list.InsertItem(self.file_list.GetItemCount(), file, icon_idx)
-                size_kb = os.path.getsize(file_path) / 1024
-                self.file_list.SetItem(index, 1, f"{size_kb:.1f}")
-                mod_time = os.path.getmtime(file_path)
-                date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mod_time))
-                self.file_list.SetItem(index, 2, date_str)
-                self.file_list.SetItemData(index, 2)  # 2 for file
-            
-            # Update file count
-            rep_files = [f for f in files if f.lower().endswith('.rep')]
-            self.file_count_label.SetLabel(f"Found: {len(rep_files)} replays")
-            
+            with os.scandir(directory_path) as entries:
+                for entry in entries:
+                    if load_id != self.load_id:
+                        return  # Another directory was opened meanwhile
+                    try:
+                        if entry.is_dir():
+                            mod_time = entry.stat().st_mtime
+                            directories.append((entry.name, "", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mod_time)), 1))
+                        elif not self.filter_bin_only or entry.name.lower().endswith('.rep'):
+                            stat = entry.stat()
+                            date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime))
+                            files.append((entry.name, f"{stat.st_size / 1024:.1f}", date_str, 2))
+                            if entry.name.lower().endswith('.rep'):
+                                index_entries.append((entry.name, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        continue  # Entry vanished or is inaccessible
         except Exception as e:
-            wx.MessageBox(f"Error loading directory: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
+            wx.CallAfter(self.on_directory_load_error, load_id, e)
+            return
+
+        directories.sort()
+        files.sort()
+        rows = directories + files
+        for start in range(0, len(rows), self.LOAD_BATCH_SIZE):
+            wx.CallAfter(self.append_file_rows, load_id, rows[start:start + self.LOAD_BATCH_SIZE])
+
+        rep_count = sum(1 for f in files if f[0].lower().endswith('.rep'))
+        wx.CallAfter(self.finish_directory_load, load_id, bool(files), rep_count, on_loaded)
+
+        # Replays indexed before show their parsed columns right away, the indexer only parses what changed
+        db = replay_index.ReplayIndexDB()
+        try:
+            wx.CallAfter(self.apply_summaries, load_id, db.get_summaries(directory_path, index_entries))
+        finally:
+            db.conn.close()
+        self.replay_indexer.index_directory(directory_path, index_entries)
+
+    def append_file_rows(self, load_id, rows):
+        if load_id != self.load_id:
+            return
+        start = len(self.file_list.model)
+        # 1 for folder, 2 for file
+        self.file_list.append_rows(((name, size_str, date_str), item_type) for name, size_str, date_str, item_type in rows)
+        self.file_rows.update((row[0], start + offset) for offset, row in enumerate(rows))
+
+    def finish_directory_load(self, load_id, has_files, rep_count, on_loaded):
+        if load_id != self.load_id:
+            return
+        if has_files:
+            self.action_all_btn.Enable()
+        else:
+            self.action_all_btn.Disable()
+        # Update file count
+        if self.search_text:
+            self.update_file_count()
+        else:
+            self.file_count_label.SetLabel(f"Found: {rep_count} replays")
+        if on_loaded:
+            on_loaded()
+
+    def on_directory_load_error(self, load_id, error):
+        if load_id != self.load_id:
+            return
+        self.file_count_label.SetLabel("")
+        wx.MessageBox(f"Error loading directory: {str(error)}", "Error", wx.OK | wx.ICON_ERROR)
+
+    def select_files(self, filenames):
+        """Select and focus the rows whose filename is in filenames"""
+        for index in range(self.file_list.GetItemCount()):
+            if self.file_list.GetItemText(index) in filenames:
+                self.file_list.Select(index)
+                self.file_list.Focus(index)
     
     def on_select_directory(self, event):
         selected_path = self.dir_path.GetPath()
@@ -409,139 +765,171 @@ class ReplayBrowserTab(wx.Panel):
             self.load_directory(new_dir)
     
     def on_search(self, event):
-        search_text = self.search_ctrl.GetValue().lower()
-        self.filter_files(search_text)
+        # Filter once typing pauses instead of on every keystroke
+        if self.search_timer and self.search_timer.IsRunning():
+            self.search_timer.Stop()
+        self.search_timer = wx.CallLater(self.SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self.filter_files(self.search_ctrl.GetValue().lower())
+
+    def on_search_mode(self, event):
+        self.search_text = ""  # Results of the other mode can not be narrowed
+        self.apply_search()
+
+    def is_content_search(self):
+        return self.tab_type == "local" and self.search_mode.GetSelection() == 1
+
+    def on_index_progress(self, directory, done, total, summaries):
+        """Called on the indexer thread whenever parsed replays of directory are committed"""
+        wx.CallAfter(self.update_index_progress, directory, done, total, summaries)
+
+    def update_index_progress(self, directory, done, total, summaries):
+        if directory != self.current_directory:
+            return
+        self.index_progress = (done, total)
+        self.apply_summaries(self.load_id, summaries)
+        if done >= total:
+            self.summary_timer.Stop()
+        if self.search_text and self.is_content_search():
+            # Newly indexed replays may match, search again instead of narrowing
+            search_text = self.search_text
+            self.search_text = ""
+            self.filter_files(search_text)
+        else:
+            self.update_file_count()
     
+    def on_summary_timer(self, event):
+        """Have the indexer parse the visible replays next while it works through the directory"""
+        view = self.file_list.view
+        top = self.file_list.GetTopItem()
+        rows = view[top:top + self.file_list.GetCountPerPage() + 1]
+        if rows == self.summary_visible:
+            return
+        self.summary_visible = rows
+        get_text = self.file_list.model.get_text
+        names = [get_text(row, 0) for row in rows if self.file_list.model.get_type(row) == 2]
+        names = [name for name in names if name.lower().endswith('.rep') and name not in self.summarized]
+        if names:
+            self.replay_indexer.prioritize(self.current_directory, names)
+
+    def apply_summaries(self, load_id, summaries):
+        """Fill the parsed columns of the listed replays from {name: summary}"""
+        if load_id != self.load_id or not summaries:
+            return
+        model = self.file_list.model
+        for name, summary in summaries.items():
+            row = self.file_rows.get(name)
+            if row is not None:
+                model.set_texts(row, self.SUMMARY_COLUMN, self.summary_columns(summary))
+                self.summarized.add(name)
+        self.file_list.Refresh()
+        if self.selection_keys:
+            self.remember_selection_summaries({os.path.join(self.current_directory, name): summary for name, summary in summaries.items()})
+
+    def summary_columns(self, summary):
+        """Map, match type, players, result and duration columns of an index summary"""
+        duration = self.format_duration(summary['duration_frames'])
+        return (summary['map'], summary['match_type'], self.format_players(summary['players']), summary['result'], duration)
+
+    def format_duration(self, frames):
+        seconds = frames // 30
+        return f"{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}"
+
+    def format_players(self, players):
+        """Players with their factions, teams separated by vs"""
+        teams = {}
+        for player in players:
+            if player['faction'] != 'Observer':
+                teams.setdefault(player['team'], []).append(f"{player['name']} ({player['faction_short']})")
+        return " vs ".join(", ".join(names) for _, names in sorted(teams.items()))
+
     def on_search_cancel(self, event):
         self.search_ctrl.SetValue("")
-        if self.tab_type == "local":
-            self.load_directory(self.current_directory)
-        else:
-            self.display_files(self.all_files)
+        if self.search_timer and self.search_timer.IsRunning():
+            self.search_timer.Stop()
+        self.filter_files("")
     
     def filter_files(self, search_text):
+        """Filter the listed rows by name in memory, narrowing the previous result when the query is extended"""
+        model = self.file_list.model
+        narrow = bool(self.search_text) and search_text.startswith(self.search_text) and self.file_list.filter_func is not None
+        self.search_text = search_text
+        if search_text and self.is_content_search():
+            matches = self.replay_index.search(self.current_directory, search_text)
+            get_type = model.get_type
+            self.file_list.set_filter(lambda row: get_type(row) == 0 or model.get_text(row, 0) in matches)
+        elif search_text and self.tab_type == "online":
+            names = model.get_sort_keys(0)
+            metadata_text = model.metadata_text  # Map, match type, players and match id once fetched
+            self.file_list.set_filter(lambda row: search_text in names[row] or search_text in metadata_text(row), narrow=narrow)
+        elif search_text:
+            names = model.get_sort_keys(0)  # Lowercase names, extended by the model as rows are appended
+            get_type = model.get_type
+            self.file_list.set_filter(lambda row: get_type(row) == 0 or search_text in names[row], narrow=narrow)
+        else:
+            self.file_list.set_filter(None)
+        self.update_file_count()
+
+    def update_file_count(self):
         if self.tab_type == "local":
-            self.file_list.DeleteAllItems()
-            try:
-                if os.path.abspath(self.current_directory) != os.path.abspath(os.path.dirname(self.current_directory)):
-                    index = self.file_list.InsertItem(0, "..", self.file_list.folder_idx)
-                    self.file_list.SetItem(index, 1, "")
-                    self.file_list.SetItem(index, 2, "")
-                    self.file_list.SetItemData(index, 0)  # 0 for parent directory
-                
-                items = os.listdir(self.current_directory)
-                directories = []
-                files = []
-                
-                for item in items:
-                    item_path = os.path.join(self.current_directory, item)
-                    if os.path.isdir(item_path) and search_text in item.lower():
-                        directories.append(item)
-                    elif (not self.filter_bin_only or item.lower().endswith('.rep')) and search_text in item.lower():
-                        files.append(item)
-                
-                directories.sort()
-                files.sort()
-                
-                # Add matching directories with type=1
-                for directory in directories:
-                    dir_path = os.path.join(self.current_directory, directory)
-                    index = self.file_list.InsertItem(self.file_list.GetItemCount(), directory, self.file_list.folder_idx)
-                    self.file_list.SetItem(index, 1, "")
-                    mod_time = os.path.getmtime(dir_path)
-                    date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mod_time))
-                    self.file_list.SetItem(index, 2, date_str)
-                    self.file_list.SetItemData(index, 1)  # 1 for folder
-                
-                # Add matching files with type=2
-                for file in files:
-                    file_path = os.path.join(self.current_directory, file)
-                    icon_idx = self.file_list.rep_file_idx if file.lower().endswith('.rep') else self.file_list.file_idx
-                    
-                    index = self.file_list.InsertItem(self.file_list.GetItemCount(), file, icon_idx)
-                    size_kb = os.path.getsize(file_path) / 1024
-                    self.file_list.SetItem(index, 1, f"{size_kb:.1f}")
-                    mod_time = os.path.getmtime(file_path)
-                    date_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mod_time))
-                    self.file_list.SetItem(index, 2, date_str)
-                    self.file_list.SetItemData(index, 2)  # 2 for file
-                
-                rep_files = [f for f in files if f.lower().endswith('.rep')]
-                self.file_count_label.SetLabel(f"Found: {len(rep_files)} replays")
-                
-            except Exception as e:
-                wx.MessageBox(f"Error while searching: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
-        elif self.tab_type == 'online':
-            self.file_list.DeleteAllItems()  
-            search_text = search_text.lower()
-            for name, size, date, gt_dir, file_url in self.all_files:
-                if search_text in name.lower():
-                    icon = self.file_list.rep_file_idx if name.lower().endswith('.rep') else self.file_list.file_idx
-                    idx = self.file_list.InsertItem(self.file_list.GetItemCount(), name, icon)
-                    self.file_list.SetItem(idx, 1, str(size))
-                    self.file_list.SetItem(idx, 2, date)
-                    self.file_list.SetItem(idx, 3, gt_dir)
-                    self.file_list.SetItem(idx, 4, file_url)
-                    self.file_list.SetItemData(idx, 2)
-            self.file_count_label.SetLabel(f"Found: {self.file_list.GetItemCount()} replays")
+            names = self.file_list.model.get_sort_keys(0)
+            rep_count = sum(1 for row in self.file_list.view if names[row].endswith('.rep'))
+            done, total = self.index_progress
+            if done < total:
+                self.file_count_label.SetLabel(f"Found: {rep_count} replays (indexing {done}/{total})")
+                return
+        else:
+            rep_count = self.file_list.GetItemCount()
+        self.file_count_label.SetLabel(f"Found: {rep_count} replays")
 
     def on_file_selected(self, event):
+        if self.file_list.restoring_selection:
+            return
         index = event.GetIndex()
         item_type = self.file_list.GetItemData(index)
         if item_type in [1, 2]:
             if self.file_list.GetSelectedItemCount() > 1:
-                self.properties_list.DeleteAllItems()
-                self.details_list.DeleteAllItems()
-                self.selected_file_path = ""
+                self.schedule_selection_summary()
             else:
                 if item_type == 2:
 
                     self.action_btn.Enable()
                     
-                    filename = self.file_list.GetItemText(index)
                     if self.tab_type == "local":
-                        self.selected_file_path = os.path.join(self.current_directory, filename)
                         self.move_btn.Enable()
                         self.delete_btn.Enable() 
-                    elif self.tab_type == 'online':
-                        self.selected_file_path = self.file_list.GetItem(index, 4).GetText()
-                    self.properties_list.DeleteAllItems()
-                    self.details_list.DeleteAllItems()
-                    
-                    self.populate_loading()
-                    
-                    self.fetch_id += 1  # Invalidate previous fetch
-                    current_id = self.fetch_id
-                    if self.tab_type == "local":
-                        if os.path.exists(self.selected_file_path):
-                            threading.Thread(target=self.fetch_info, args=(self.selected_file_path, 'local', current_id), daemon=True).start()
-                    elif self.tab_type == 'online':
-                        threading.Thread(target=self.fetch_info, args=(self.selected_file_path, 'online', current_id), daemon=True).start()
+                    self.schedule_preview(index)
         else:
             self.action_btn.Disable()
             if self.tab_type == "local":
                 self.move_btn.Disable()
                 self.delete_btn.Disable()
+            self.cancel_preview()
+            self.cancel_selection_summary()
             self.selected_file_path = ""
             self.properties_list.DeleteAllItems()
             self.details_list.DeleteAllItems()
     
     def populate_loading(self):
         self.properties_list.DeleteAllItems()
-        self.properties_list.InsertItem(0, "Loading...")
-        self.properties_list.SetItem(0, 1, "Loading...")
+        self.properties_list.add_row(("Loading...", "Loading..."))
         self.details_list.DeleteAllItems()
-        self.details_list.InsertItem(0, "Loading...")
+        self.details_list.add_row(("Loading...",))
         # index = self.details_list.InsertItem(0, "Loading")
         # for col in range(1, 10):
         #     self.details_list.SetItem(index, col, "Loading")
 
     def on_file_deselected(self, event):
+        if self.file_list.restoring_selection:
+            return
         if self.file_list.GetSelectedItemCount() == 0:
             self.action_btn.Disable()
             if self.tab_type == "local":
                 self.move_btn.Disable()
                 self.delete_btn.Disable()
+            self.cancel_preview()
+            self.cancel_selection_summary()
             self.selected_file_path = ""
             self.properties_list.DeleteAllItems()
             self.details_list.DeleteAllItems()
@@ -551,42 +939,313 @@ class ReplayBrowserTab(wx.Panel):
             if index != -1:
                 item_type = self.file_list.GetItemData(index)
                 if item_type == 2:
-                    filename = self.file_list.GetItemText(index)
-                    if self.tab_type == "local":
-                        self.selected_file_path = os.path.join(self.current_directory, filename)
-                    elif self.tab_type == 'online':
-                        self.selected_file_path = self.file_list.GetItem(index, 4).GetText()
-                    self.properties_list.DeleteAllItems()
-                    self.details_list.DeleteAllItems()
-                    
-                    self.populate_loading()
-                    
-                    self.fetch_id += 1  # Invalidate previous fetch
-                    current_id = self.fetch_id
-                    if self.tab_type == "local":
-                        if os.path.exists(self.selected_file_path):
-                            threading.Thread(target=self.fetch_info, args=(self.selected_file_path, 'local', current_id), daemon=True).start()
-                    elif self.tab_type == 'online':
-                        threading.Thread(target=self.fetch_info, args=(self.selected_file_path, 'online', current_id), daemon=True).start()
-    
-    def fetch_info(self, selected_file, mode, fetch_id):
-        # If fetch ID is outdated, cancel
+                    self.schedule_preview(index)
+
+        else:
+            self.schedule_selection_summary()
+
+    def schedule_preview(self, index):
+        """Show the properties of the replay at index once the selection has settled"""
+        self.cancel_selection_summary()
+        filename = self.file_list.GetItemText(index)
+        if self.tab_type == "local":
+            selected_file = os.path.join(self.current_directory, filename)
+        else:
+            selected_file = self.file_list.GetItemText(index, 4)
+        self.preview_row = self.file_list.view[index]
+        in_flight = (self.preview_timer and self.preview_timer.IsRunning()) or (self.preview_future and not self.preview_future.done())
+        if selected_file == self.selected_file_path and in_flight:
+            return  # Already on its way, restarting would abort a download that is under way
+        self.selected_file_path = selected_file
+
+        self.fetch_id += 1  # Invalidate previous fetch
+        cached = self.get_cached_preview(self.selected_file_path)
+        if cached:
+            if self.preview_timer and self.preview_timer.IsRunning():
+                self.preview_timer.Stop()
+            self.display_file_properties(*cached, self.fetch_id)
+            return
+
+        self.populate_loading()
+        # Holding an arrow key only restarts the timer, nothing is parsed or downloaded for the rows passed over
+        if self.preview_timer and self.preview_timer.IsRunning():
+            self.preview_timer.Stop()
+        self.preview_timer = wx.CallLater(self.PREVIEW_DELAY_MS, self.start_preview, self.selected_file_path, self.fetch_id)
+
+    def schedule_selection_summary(self):
+        """Summarize the selected replays once the selection has settled, the previous summary stays shown meanwhile"""
+        self.cancel_preview()
+        self.selected_file_path = ""
+        if not self.selection_paths:
+            self.properties_list.DeleteAllItems()
+            self.details_list.DeleteAllItems()
+        if self.selection_timer and self.selection_timer.IsRunning():
+            self.selection_timer.Stop()
+        self.selection_timer = wx.CallLater(self.SELECTION_DELAY_MS, self.start_selection_summary)
+
+    def cancel_selection_summary(self):
+        self.selection_id += 1
+        self.selection_paths = []
+        self.selection_keys = set()
+        if self.selection_timer and self.selection_timer.IsRunning():
+            self.selection_timer.Stop()
+        if self.selection_job:
+            self.selection_job.cancel()
+            self.selection_job = None
+
+    def selected_replay_paths(self):
+        """Paths (local) or urls (online) of the selected replays"""
+        model = self.file_list.model
+        paths = []
+        for row in self.file_list.get_selected_rows():
+            name = model.get_text(row, 0)
+            if model.get_type(row) != 2 or not name.lower().endswith('.rep'):
+                continue
+            paths.append(os.path.join(self.current_directory, name) if self.tab_type == "local" else model.get_text(row, 4))
+        return paths
+
+    def start_selection_summary(self):
+        if not self or self.file_list.GetSelectedItemCount() < 2:
+            return
+        self.cancel_selection_summary()
+        self.selection_paths = self.selected_replay_paths()
+        self.selection_keys = set(self.selection_paths)
+        # Replays summarized for an earlier selection are reused, only the newly selected ones are looked up
+        missing = [path for path in self.selection_paths if path not in self.selection_summaries]
+        self.show_selection_summary(self.selection_id)
+        if missing:
+            selection_id = self.selection_id
+            summaries = self.selection_summaries
+            directory = self.current_directory
+            self.selection_job = self.jobs.submit(
+                "Summarizing selection", lambda job: self.summarize_selection(job, selection_id, summaries, directory, missing),
+                total=len(missing), on_done=lambda job: wx.CallAfter(self.show_selection_summary, selection_id)
+            )
+
+    def summarize_selection(self, job, selection_id, summaries, directory, paths):
+        """Fill summaries for paths. Local replays come from the replay index and the rest are parsed on the cpu pool,
+        online replays from their headers fetched on the io pool. Unreadable replays are stored as None"""
+        shown_at = time.monotonic()
+
+        def store(path, summary):
+            nonlocal shown_at
+            summaries[path] = summary
+            job.update(done=1 if summary else 0, failed=0 if summary else 1)
+            if time.monotonic() - shown_at >= self.SELECTION_REFRESH_SECONDS:
+                shown_at = time.monotonic()
+                wx.CallAfter(self.show_selection_summary, selection_id)
+
+        if self.tab_type == "local":
+            entries = {}  # name -> (path, size, mtime)
+            for path in paths:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    store(path, None)
+                    continue
+                entries[os.path.basename(path)] = (path, stat.st_size, stat.st_mtime)
+            db = replay_index.ReplayIndexDB()
+            try:
+                stored = db.get_summaries(directory, [(name, size, mtime) for name, (_, size, mtime) in entries.items()])
+            finally:
+                db.conn.close()
+            for name, summary in stored.items():
+                store(entries.pop(name)[0], summary)
+            tasks = [(path, name, size, mtime) for name, (path, size, mtime) in entries.items()]
+            for name, size, mtime, summary in worker_pool.imap_unordered('cpu', replay_index.parse_replay_worker, tasks,
+                                                                         chunksize=4, cancel=job.cancel_event):
+                store(os.path.join(directory, name), summary)
+        else:
+            tasks = [(url, url) for url in paths]
+            for attempt in range(self.REQUEUE_ROUNDS + 1):
+                retry = []
+                for url, summary, failure in worker_pool.imap_unordered('io', get_replay_header_worker, tasks,
+                                                                        cancel=job.cancel_event):
+                    if failure == 'transient' and attempt < self.REQUEUE_ROUNDS:
+                        retry.append((url, url))
+                    else:
+                        store(url, summary)
+                if not retry or job.is_cancelled():
+                    break
+                tasks = retry
+
+    def remember_selection_summaries(self, summaries):
+        """Keep {path or url: summary} parsed elsewhere that belong to the current selection, and show them"""
+        found = {path: summary for path, summary in summaries.items()
+                 if path in self.selection_keys and path not in self.selection_summaries}
+        if found:
+            self.selection_summaries.update(found)
+            self.show_selection_summary(self.selection_id)
+
+    def show_selection_summary(self, selection_id):
+        """Show the games, results per player, faction and map counts and total duration of the selected replays"""
+        if not self or selection_id != self.selection_id:
+            return
+        summaries = [self.selection_summaries[path] for path in self.selection_paths if path in self.selection_summaries]
+        pending = len(self.selection_paths) - len(summaries)
+        known = [summary for summary in summaries if summary]
+        stats = replay_index.summarize_replays(known)
+
+        self.properties_list.DeleteAllItems()
+        self.details_list.DeleteAllItems()
+        rows = [("Selected Replays", str(len(self.selection_paths)))]
+        if pending:
+            rows.append(("Summarizing", f"{len(summaries)}/{len(self.selection_paths)}"))
+        if len(summaries) > len(known):
+            rows.append(("Unreadable", str(len(summaries) - len(known))))
+        rows.append(("Games", str(stats['games'])))
+        if stats['no_result']:
+            rows.append(("Games Without Result", str(stats['no_result'])))
+        duration = self.format_duration(stats['duration_frames'])
+        if stats['no_duration']:
+            duration += f" (without {stats['no_duration']} game(s) of unknown length)"
+        rows.append(("Total Duration", duration))
+        for name, (games, wins, losses) in sorted(stats['players'].items(), key=lambda item: (-item[1][0], item[0].lower())):
+            rows.append((f"Player: {name}", f"{games} games, {wins} wins, {losses} losses"))
+        for faction, count in stats['factions'].most_common():
+            rows.append((f"Faction: {faction}", str(count)))
+        for map_name, count in stats['maps'].most_common():
+            rows.append((f"Map: {map_name}", str(count)))
+        for row in rows:
+            self.properties_list.add_row(row)
+
+    def start_preview(self, selected_file, fetch_id):
         if fetch_id != self.fetch_id:
             return
+        self.preview_cancel.set()  # Abort the previous preview, if it is still running
+        if self.preview_future:
+            self.preview_future.cancel()
+        if self.tab_type == "local" and not os.path.exists(selected_file):
+            return
+        self.preview_cancel = threading.Event()
+        self.preview_future = self.preview_executor.submit(self.fetch_info, selected_file, self.tab_type, fetch_id, self.preview_cancel)
+
+    def cancel_preview(self):
+        """Drop the pending preview, an in-flight download is aborted at its next chunk"""
+        self.fetch_id += 1
+        if self.preview_timer and self.preview_timer.IsRunning():
+            self.preview_timer.Stop()
+        self.preview_cancel.set()
+        self.prefetch_cancel.set()
+        if self.preview_future:
+            self.preview_future.cancel()
+            self.preview_future = None
+
+    def on_destroy(self, event):
+        if event.GetEventObject() is self:
+            self.cancel_preview()
+            self.cancel_selection_summary()
+            self.preview_executor.shutdown(wait=False, cancel_futures=True)
+            self.prefetch_executor.shutdown(wait=False, cancel_futures=True)
+            if self.tab_type == "local":
+                self.summary_timer.Stop()
+            if self.tab_type == "online":
+                self.metadata_timer.Stop()
+                self.metadata_stop.set()
+                self.metadata_wake.set()
+        event.Skip()
+
+    def start_prefetch(self):
+        """Parse the rows around the previewed one into the preview cache while it is being looked at"""
+        self.prefetch_cancel.set()
+        self.prefetch_cancel = cancel = threading.Event()
+        view = self.file_list.view
+        model = self.file_list.model
+        try:
+            position = view.index(self.preview_row)  # Rows may have been sorted, filtered or streamed in meanwhile
+        except ValueError:
+            return
+        for offset in range(1, self.PREFETCH_ROWS + 1):
+            for index in (position + offset, position - offset):
+                if not 0 <= index < len(view) or model.get_type(view[index]) != 2:
+                    continue
+                if self.tab_type == "local":
+                    selected_file = os.path.join(self.current_directory, model.get_text(view[index], 0))
+                else:
+                    selected_file = model.get_text(view[index], 4)
+                if selected_file.lower().endswith('.rep'):
+                    self.prefetch_executor.submit(self.prefetch_info, selected_file, self.tab_type, cancel)
+
+    def prefetch_info(self, selected_file, mode, cancel):
+        if cancel.is_set():
+            return
+        try:
+            self.load_preview(selected_file, mode, cancel)
+        except Exception:
+            pass  # Reported if the replay gets selected
+
+    def load_preview(self, selected_file, mode, cancel):
+        """Return (file_prop, player_info) of selected_file from the cache or by parsing it, None if cancelled"""
+        cached = self.get_cached_preview(selected_file)
+        if cached:
+            return cached
+        data = download_replay(selected_file, cancel) if mode == 'online' else None
+        if cancel.is_set():
+            return None
+        rep1 = replay_result.ReplayResultParser(selected_file, mode, data=data)
+        result = (rep1.get_replay_info_gui(), rep1.get_players_info_gui())
+        if result[0] and result[1]:
+            self.cache_preview(selected_file, result)
+        return result
+
+    def preview_stamp(self, selected_file):
+        """Size and mtime of a local replay, so cached results of a file that changed are not used"""
+        if self.tab_type != "local":
+            return None
+        try:
+            stat = os.stat(selected_file)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get_cached_preview(self, selected_file):
+        stamp = self.preview_stamp(selected_file)
+        with self.preview_cache_lock:
+            entry = self.preview_cache.get(selected_file)
+            if entry is None or entry[0] != stamp:
+                return None
+            self.preview_cache.move_to_end(selected_file)
+            return entry[1]
+
+    def cache_preview(self, selected_file, result):
+        stamp = self.preview_stamp(selected_file)
+        with self.preview_cache_lock:
+            self.preview_cache[selected_file] = (stamp, result)
+            self.preview_cache.move_to_end(selected_file)
+            while len(self.preview_cache) > self.PREVIEW_CACHE_SIZE:
+                self.preview_cache.popitem(last=False)
+    
+    def fetch_info(self, selected_file, mode, fetch_id, cancel):
+        """Runs on the preview executor, a superseded fetch stops as soon as cancel is set"""
+        if cancel.is_set():
+            return
         file_prop = None
         player_info = None
         try:
             if selected_file.lower().endswith('.rep'):
-                rep1 = replay_result.ReplayResultParser(selected_file, mode)
-                file_prop = rep1.get_replay_info_gui()
-                player_info = rep1.get_players_info_gui()
+                result = self.load_preview(selected_file, mode, cancel)
+                if result is None:
+                    return
+                file_prop, player_info = result
         except Exception as e:
-            wx.MessageBox(f"Error: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
+            wx.CallAfter(self.show_preview_error, e, fetch_id)
+            return
         if file_prop and player_info :
             wx.CallAfter(self.display_file_properties, file_prop, player_info, fetch_id)
         else:
-            self.properties_list.DeleteAllItems()
-            self.details_list.DeleteAllItems()
+            wx.CallAfter(self.clear_preview, fetch_id)
+
+    def clear_preview(self, fetch_id):
+        if fetch_id != self.fetch_id:
+            return
+        self.properties_list.DeleteAllItems()
+        self.details_list.DeleteAllItems()
+
+    def show_preview_error(self, error, fetch_id):
+        if fetch_id != self.fetch_id:
+            return
+        self.clear_preview(fetch_id)
+        wx.MessageBox(f"Error: {str(error)}", "Error", wx.OK | wx.ICON_ERROR)
 
     def display_file_properties(self, file_prop, player_info, fetch_id):
         if fetch_id != self.fetch_id:
@@ -600,8 +1259,7 @@ class ReplayBrowserTab(wx.Panel):
         for i, (prop, value) in enumerate(file_prop[:-1]):
             if (prop == "SW Restriction") and (value == "Unknown"):
                 continue
-            index = self.properties_list.InsertItem(self.properties_list.GetItemCount(), prop)
-            self.properties_list.SetItem(index, 1, str(value))
+            index = self.properties_list.add_row((prop, str(value)))
 
             # Set the color based on
             if prop == "Match Result":
@@ -624,11 +1282,12 @@ class ReplayBrowserTab(wx.Panel):
         # Add player info to details_list
         for row in player_info:
             if len(row) > 0:
-                index = self.details_list.InsertItem(self.details_list.GetItemCount(), str(row[0]))
                 color_num = row[-1]
-                for col in range(1, min(len(row), self.details_list.GetColumnCount())):
-                    self.details_list.SetItem(index, col, str(row[col]))
+                index = self.details_list.add_row(row[:self.details_list.GetColumnCount()])
                 self.details_list.SetItemTextColour(index, version_config[ver_str]['colors'].get(color_num, ['Unknown', (0, 0, 0)])[1])
+
+        # The next replay looked at is almost always a neighbouring row
+        self.start_prefetch()
                 
     def on_action_file(self, event):
         if self.tab_type == "local":
@@ -643,41 +1302,16 @@ class ReplayBrowserTab(wx.Panel):
             self.on_download_all_files()
     
     def on_rename_file(self):
-        selected_indices = []
+        filenames = []
         index = self.file_list.GetFirstSelected()
         while index != -1:
-            selected_indices.append(index)
+            filename = self.file_list.GetItemText(index)
+            if filename.lower().endswith('.rep') and self.file_list.GetItemData(index) == 2:
+                filenames.append(filename)
             index = self.file_list.GetNextSelected(index)
 
-        if not selected_indices:
-            return
-
-        renamed_files = []
-
-        try:
-            for index in selected_indices:
-                selected_file = self.file_list.GetItemText(index)
-                filepath = os.path.join(self.current_directory, selected_file)
-                
-                if not filepath.lower().endswith('.rep'):
-                    continue
-                    
-                new_filename = self.rename_file(filepath)
-                renamed_files.append(new_filename)
-
-            self.search_ctrl.Clear()
-            self.load_directory(self.current_directory)
-            for index in range(self.file_list.GetItemCount()):
-                new_filename = self.file_list.GetItemText(index)
-                if new_filename in renamed_files:
-                    self.file_list.Select(index)
-                    self.file_list.Focus(index)
-
-            if renamed_files:
-                wx.MessageBox(f"{len(renamed_files)} file(s) renamed successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
-
-        except Exception as e:
-            wx.MessageBox(f"Error renaming files: {e}", "Error", wx.OK | wx.ICON_ERROR)
+        if filenames:
+            self.start_rename(filenames, show_plan=False)
     
     def on_rename_all_files(self):
         item_count = self.file_list.GetItemCount()
@@ -686,80 +1320,109 @@ class ReplayBrowserTab(wx.Panel):
             wx.MessageBox("No files to rename.", "Info", wx.OK | wx.ICON_INFORMATION)
             return
 
-        file_list = []
+        filenames = []
 
         for index in range(item_count):
             filename = self.file_list.GetItemText(index)
-            filepath = os.path.join(self.current_directory, filename)
-            
-            if filepath.lower().endswith('.rep') and self.file_list.GetItemData(index) == 2:
-                file_list.append(filepath)
+            if filename.lower().endswith('.rep') and self.file_list.GetItemData(index) == 2:
+                filenames.append(filename)
 
-        if not file_list:
+        if not filenames:
             wx.MessageBox("No .rep files found for renaming.", "Info", wx.OK | wx.ICON_INFORMATION)
             return
 
-        dlg = wx.ProgressDialog(
-            "Renaming Files",
-            "Working...",
-            maximum=len(file_list),
-            parent=self,
-            style=wx.PD_AUTO_HIDE | wx.PD_APP_MODAL | wx.PD_ELAPSED_TIME
-        )
+        self.start_rename(filenames, show_plan=True)
 
-        renamed_files = []
+    def start_rename(self, filenames, show_plan):
+        """Build the rename plan for filenames as a background job, then show it as a dry run or apply it"""
+        directory = self.current_directory
+        self.jobs.submit(
+            "Reading replays to rename", lambda job: self.build_rename_plan(job, directory, filenames), total=len(filenames),
+            on_done=lambda job: wx.CallAfter(self.on_rename_plan_ready, job, directory, show_plan)
+        )
 
-        try:
-            for idx, filepath in enumerate(file_list):
-                new_filename = self.rename_file(filepath)
-                renamed_files.append(new_filename)
-                dlg.Update(idx + 1, f"Renaming ({idx + 1}/{len(file_list)})")
-                wx.Yield()
-                
-            self.search_ctrl.Clear()
-            self.load_directory(self.current_directory)
-            
-            for index in range(self.file_list.GetItemCount()):
-                new_filename = self.file_list.GetItemText(index)
-                if new_filename in renamed_files:
-                    self.file_list.Select(index)
-                    self.file_list.Focus(index)
-                    
-            dlg.Update(len(file_list), f"{len(file_list)} files renamed successfully!")
-            wx.MessageBox(f"{len(file_list)} file(s) renamed successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
-            
-        except Exception as e:
-            wx.MessageBox(f"Error renaming files: {e}", "Error", wx.OK | wx.ICON_ERROR)
-        finally:
-            dlg.Destroy()
-    
-    def rename_file(self, filepath):
-        try:
-            rep2 = replay_result.ReplayResultParser(filepath)
-            base_name = rep2.get_new_replay_name()
+    def build_rename_plan(self, job, directory, filenames):
+        """Parse the replays in a process pool, then resolve name collisions in memory. Returns (plan, errors)"""
+        new_names = {}
+        errors = []
+        paths = [os.path.join(directory, filename) for filename in filenames]
+        for filename, base_name, error in worker_pool.imap_unordered('cpu', get_new_name_worker, paths, chunksize=16, cancel=job.cancel_event):
             if base_name:
-                new_filename = f"{base_name}.rep"
-                new_filepath = os.path.join(os.path.dirname(filepath), new_filename)
-                current_filename = os.path.basename(filepath)
-                
-                counter = 1
-                while os.path.exists(new_filepath):
-                    if new_filename == current_filename:
-                        return new_filename
-                    else:
-                        new_filename = f"{base_name}_{counter}.rep"
-                        new_filepath = os.path.join(os.path.dirname(filepath), new_filename)
-                        counter += 1
-
-                os.rename(filepath, new_filepath)
-                return new_filename
+                new_names[filename] = base_name
+                job.update(done=1)
             else:
-                self.properties_list.DeleteAllItems()
-                self.details_list.DeleteAllItems()
-        except Exception as e:
+                errors.append((filename, error or "No name could be built from the replay"))
+                job.update(failed=1)
+        if job.is_cancelled():
+            return None
+        plan = plan_renames(os.listdir(directory), [(filename, new_names[filename]) for filename in filenames if filename in new_names])
+        return plan, errors
+
+    def on_rename_plan_ready(self, job, directory, show_plan):
+        if not self or job.state == 'cancelled':
+            return
+        if job.error:
+            self.on_rename_error(job.error)
+            return
+        plan, errors = job.result
+        changes = [(old_name, new_name) for old_name, new_name in plan if old_name != new_name]
+        if show_plan:
+            with RenamePlanDialog(self, changes, len(plan) - len(changes), errors) as dlg:
+                if dlg.ShowModal() != wx.ID_OK:
+                    return
+
+        self.jobs.submit(
+            "Renaming replays", lambda job: self.apply_rename_plan(job, directory, plan, errors), total=len(changes),
+            on_done=lambda job: wx.CallAfter(self.on_rename_done, job, directory)
+        )
+
+    def apply_rename_plan(self, job, directory, plan, errors):
+        """Rename the files of a resolved plan in one pass, the plan only targets names that were free.
+        Returns (renamed files, errors)"""
+        renamed_files = []
+        errors = list(errors)
+        for old_name, new_name in plan:
+            if job.is_cancelled():
+                break
+            if old_name == new_name:
+                renamed_files.append(new_name)
+                continue
+            new_filepath = os.path.join(directory, new_name)
+            try:
+                if os.path.exists(new_filepath):
+                    raise FileExistsError(f"{new_name} was created after the rename was planned")
+                os.rename(os.path.join(directory, old_name), new_filepath)
+                renamed_files.append(new_name)
+                job.update(done=1)
+            except OSError as e:
+                errors.append((old_name, str(e)))
+                job.update(failed=1)
+        return renamed_files, errors
+
+    def on_rename_done(self, job, directory):
+        if not self:
+            return
+        if job.error:
+            self.on_rename_error(job.error)
+            return
+        renamed_files, errors = job.result
+        if directory == self.current_directory:
             self.search_ctrl.Clear()
-            self.load_directory(self.current_directory)
-            raise Exception(f"Failed to rename {filepath}: {str(e)}")
+            selected = set(renamed_files)
+            self.load_directory(directory, on_loaded=lambda: self.select_files(selected))
+
+        if errors:
+            error_text = "\n".join(f"{filename}: {error}" for filename, error in errors[:20])
+            if len(errors) > 20:
+                error_text += f"\n... and {len(errors) - 20} more file(s)"
+            wx.MessageBox(f"{len(renamed_files)} file(s) renamed, {len(errors)} failed:\n\n{error_text}", "Partial Success", wx.OK | wx.ICON_WARNING)
+        elif job.state == 'cancelled':
+            wx.MessageBox(f"Renaming cancelled, {job.done} file(s) renamed.", "Cancelled", wx.OK | wx.ICON_INFORMATION)
+        elif renamed_files:
+            wx.MessageBox(f"{len(renamed_files)} file(s) renamed successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
+
+    def on_rename_error(self, error):
+        wx.MessageBox(f"Error renaming files: {error}", "Error", wx.OK | wx.ICON_ERROR)
     
     def on_move_files(self, event):
         """Move selected files to a different directory."""
@@ -880,51 +1543,48 @@ class ReplayBrowserTab(wx.Panel):
         dlg.Destroy()
 
     def download_files(self, download_tasks):
-        total_files = len(download_tasks)
-        progress_dialog = wx.ProgressDialog(
-            "Downloading Files",
-            "Preparing to download...",
-            maximum=total_files,
-            parent=self,
-            style=wx.PD_AUTO_HIDE | wx.PD_APP_MODAL
+        """Download (index, url, save path) tasks as a background job, browsing goes on meanwhile"""
+        self.jobs.submit(
+            f"Downloading {len(download_tasks)} replay(s)", lambda job: self.download_replays(job, download_tasks),
+            total=len(download_tasks), on_done=lambda job: wx.CallAfter(self.on_download_done, job)
         )
 
+    def download_replays(self, job, download_tasks):
+        """Returns the urls downloaded and the (url, error) of those that failed"""
+        tasks = {index: (file_url, save_path) for index, file_url, save_path in download_tasks}
         downloaded_files = []
         errors = []
-
-        try:
-            with Pool(processes=10) as pool:
-                for i, result in enumerate(pool.imap_unordered(download_reps_worker, download_tasks)):
-                    index, status = result
-                    filename = self.file_list.GetItemText(index)
-                    rep_url = self.file_list.GetItem(index, 4).GetText()
-
-                    if status == 'done':
-                        downloaded_files.append(rep_url)
-                        progress_dialog.Update(i + 1, f"Downloaded {filename} ({i+1}/{total_files})")
-                    else:
-                        errors.append((rep_url, status))
-                        progress_dialog.Update(i + 1, f"Error: {filename} ({i+1}/{total_files})")
-
-                    wx.Yield()
-
-            progress_dialog.Destroy()
-            self.search_ctrl.Clear()
-            for index in range(self.file_list.GetItemCount()):
-                check_rep_url = self.file_list.GetItem(index, 4).GetText()
-                if check_rep_url in downloaded_files:
-                    self.file_list.Select(index)
-                    self.file_list.Focus(index)
-
-            if errors:
-                error_text = "\n".join(f"{f}: {msg}" for f, msg in errors)
-                wx.MessageBox(f"{len(downloaded_files)} downloaded, {len(errors)} failed:\n\n{error_text}", "Partial Success", wx.OK | wx.ICON_WARNING)
+        for index, status in worker_pool.imap_unordered('io', download_reps_worker, download_tasks, cancel=job.cancel_event):
+            rep_url, save_path = tasks[index]
+            if status == 'done':
+                downloaded_files.append(rep_url)
+                job.update(done=1, nbytes=os.path.getsize(save_path), message=os.path.basename(save_path))
             else:
-                wx.MessageBox(f"{total_files} file(s) downloaded successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
+                errors.append((rep_url, status))
+                job.update(failed=1)
+        return downloaded_files, errors
 
-        except Exception as e:
-            progress_dialog.Destroy()
-            wx.MessageBox(f"Error downloading files: {e}", "Error", wx.OK | wx.ICON_ERROR)
+    def on_download_done(self, job):
+        if not self:
+            return
+        if job.error:
+            wx.MessageBox(f"Error downloading files: {job.error}", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        downloaded_files, errors = job.result
+        # Select what was downloaded among the rows still listed, the search is left as the user set it meanwhile
+        downloaded = set(downloaded_files)
+        for index in range(self.file_list.GetItemCount()):
+            if self.file_list.GetItemText(index, 4) in downloaded:
+                self.file_list.Select(index)
+                self.file_list.Focus(index)
+
+        if errors:
+            error_text = "\n".join(f"{f}: {msg}" for f, msg in errors)
+            wx.MessageBox(f"{len(downloaded_files)} downloaded, {len(errors)} failed:\n\n{error_text}", "Partial Success", wx.OK | wx.ICON_WARNING)
+        elif job.state == 'cancelled':
+            wx.MessageBox(f"Download cancelled, {len(downloaded_files)} file(s) downloaded.", "Cancelled", wx.OK | wx.ICON_INFORMATION)
+        else:
+            wx.MessageBox(f"{len(downloaded_files)} file(s) downloaded successfully!", "Success", wx.OK | wx.ICON_INFORMATION)
     
     def get_user_id_date_from_url(self, url):
         try:
@@ -957,7 +1617,7 @@ class ReplayBrowserTab(wx.Panel):
         download_tasks = []
 
         for index in selected_indices:
-            file_url = self.file_list.GetItem(index, 4).GetText()
+            file_url = self.file_list.GetItemText(index, 4)
             filename = self.file_list.GetItemText(index)
             save_path = os.path.join(save_dir, f"{self.get_user_id_date_from_url(file_url)}_{filename}")
             download_tasks.append((index, file_url, save_path))
@@ -980,7 +1640,7 @@ class ReplayBrowserTab(wx.Panel):
 
         download_tasks = []
         for index in range(item_count):
-            file_url = self.file_list.GetItem(index, 4).GetText()
+            file_url = self.file_list.GetItemText(index, 4)
             filename = self.file_list.GetItemText(index)
             save_path = os.path.join(save_dir, f"{self.get_user_id_date_from_url(file_url)}_{filename}")
             download_tasks.append((index, file_url, save_path))
@@ -1018,6 +1678,11 @@ class ReplayBrowserTab(wx.Panel):
         self.browse_btn = wx.Button(self, label="Browse")
         self.browse_btn.Bind(wx.EVT_BUTTON, self.on_browse_directories)
         date_hbox.Add(self.browse_btn, flag=wx.LEFT, border=5)
+
+        # Fills the map, match type, players and match id columns from range-fetched replay headers
+        self.metadata_check = wx.CheckBox(self, label="Match Info")
+        self.metadata_check.Bind(wx.EVT_CHECKBOX, self.on_metadata_toggle)
+        date_hbox.Add(self.metadata_check, flag=wx.ALIGN_CENTER_VERTICAL | wx.LEFT, border=5)
         
         self.GetSizer().Insert(1, date_hbox, flag=wx.EXPAND | wx.ALL, border=5)
 
@@ -1066,68 +1731,222 @@ class ReplayBrowserTab(wx.Panel):
             self.SetWindowStyle(self.GetWindowStyle() & ~wx.STAY_ON_TOP)
 
     def load_multiple_directories(self, directories_to_fetch):
-        """Load files from multiple selected directories"""
-        self.all_files = self.run_in_pool(get_dir_files_worker, directories_to_fetch)    
-        # Display combined files
-        self.all_files.sort(key=lambda item: item[2])
-        self.display_files(self.all_files)
+        """Load files from multiple selected directories. Final listings stored by earlier browses come from the
+        database, the other directories are fetched and listed as soon as each one completes"""
+        for job in self.fetch_jobs:
+            job.cancel()
+        self.fetch_jobs = []
+        self.cancel_selection_summary()
+        self.selection_summaries = {}
+        self.reset_metadata()
+        self.file_list.DeleteAllItems()
+        if self.file_list.sort_column < 0:
+            self.file_list.sort_items(2, True)  # By date until another column is chosen
+        self.search_text = ""
+        self.filter_files(self.search_ctrl.GetValue().lower())
+
+        if self.directory_db is None:
+            self.directory_db = UserDirectoryDB()
+        stored = self.directory_db.get_final_listings(
+            [(user_dir, url_date.strftime("%Y-%m-%d")) for _, user_dir, url_date in directories_to_fetch])
+        stored_files = [file_info for files in stored.values() for file_info in files]
+        if stored_files:
+            self.display_files(stored_files)
+        to_fetch = [task for task in directories_to_fetch if (task[1], task[2].strftime("%Y-%m-%d")) not in stored]
+        if to_fetch:
+            self.run_in_pool("Listing replays", get_dir_files_worker, to_fetch, self.on_listings_fetched)
+
+    def on_listings_fetched(self, listings):
+        """Store fetched (user dir, date, files) listings for later browses and show their files"""
+        writer = wx.GetApp().directory_refresher.writer
+        for user_dir, date_str, files in listings:
+            writer.submit('store_listing', user_dir, date_str, files)
+            if files:
+                self.display_files(files)
 
     def display_files(self, files):
-        """Display files in the list control"""
-        self.file_list.DeleteAllItems()
+        """Add the files of one fetched directory to the list, merged into the current sort order"""
         self.action_all_btn.Enable()
-        for name, size, date, gt_dir, file_url in files:
-            icon = self.file_list.rep_file_idx if name.lower().endswith('.rep') else self.file_list.file_idx
-            idx = self.file_list.InsertItem(self.file_list.GetItemCount(), name, icon)
-            self.file_list.SetItem(idx, 1, str(size))
-            self.file_list.SetItem(idx, 2, date)
-            self.file_list.SetItem(idx, 3, gt_dir)
-            self.file_list.SetItem(idx, 4, file_url)
-            self.file_list.SetItemData(idx, 2)
-        self.file_count_label.SetLabel(f"Found: {len(files)} replays")
+        self.file_list.append_rows((file_info, 2) for file_info in files)
+        self.update_file_count()
     
-    def run_in_pool(self, func, urls_to_process):    
-        with wx.ProgressDialog(
-            "Fetching data",
-            "Fetching...",
-            maximum=len(urls_to_process),
-            parent=self,
-            style=wx.PD_AUTO_HIDE | wx.PD_APP_MODAL
+    def on_metadata_toggle(self, event):
+        if self.metadata_check.GetValue():
+            if self.metadata_thread is None:
+                self.metadata_thread = threading.Thread(target=self.fetch_metadata, daemon=True)
+                self.metadata_thread.start()
+            self.metadata_view = None
+            self.metadata_timer.Start(self.METADATA_POLL_MS)
+            self.prioritize_metadata()
+        else:
+            self.metadata_timer.Stop()
+            with self.metadata_lock:
+                self.metadata_queue.clear()
+
+    def on_metadata_timer(self, event):
+        self.prioritize_metadata()
+
+    def reset_metadata(self):
+        """Forget queued and in-flight header fetches, called before the listed replays are replaced"""
+        with self.metadata_lock:
+            self.metadata_generation += 1
+            self.metadata_queue.clear()
+        self.metadata_view = None
+
+    def prioritize_metadata(self):
+        """Queue the rows without metadata in view order from the top visible row, so what is on screen comes first.
+        The rows above the visible ones are queued last"""
+        view = self.file_list.view
+        top = self.file_list.GetTopItem()
+        if self.metadata_view is not None:
+            last_top, last_view, last_count = self.metadata_view
+            if last_top == top and last_view is view and last_count == len(view):
+                return
+        self.metadata_view = (top, view, len(view))
+        metadata = self.file_list.model.metadata
+        rows = [row for row in view[top:] + view[:top] if row not in metadata]
+        with self.metadata_lock:
+            self.metadata_queue = deque(rows)
+        if rows:
+            self.metadata_wake.set()
+
+    def fetch_metadata(self):
+        """Fetch replay headers of queued rows on the io pool, in small batches so a new queue order takes effect quickly"""
+        generation = None
+        requested = set()  # Rows fetched or in flight for the current listing
+        failures = {}  # Row -> transient failures for the current listing
+        while not self.metadata_stop.is_set():
+            tasks = []
+            with self.metadata_lock:
+                if generation != self.metadata_generation:
+                    generation = self.metadata_generation
+                    requested = set()
+                    failures = {}
+                while self.metadata_queue and len(tasks) < self.METADATA_BATCH:
+                    row = self.metadata_queue.popleft()
+                    if row not in requested:
+                        requested.add(row)
+                        tasks.append((row, self.file_list.model.get_text(row, 4)))
+                if not tasks:
+                    self.metadata_wake.clear()
+            if not tasks:
+                self.metadata_wake.wait()
+                continue
+            for row, summary, failure in worker_pool.imap_unordered('io', get_replay_header_worker, tasks,
+                                                                    cancel=self.metadata_stop):
+                if failure == 'transient':
+                    # Kept out of the metadata, so the row is fetched again: behind the queued rows for a few
+                    # rounds, then once prioritize_metadata queues it again
+                    failures[row] = failures.get(row, 0) + 1
+                    with self.metadata_lock:
+                        if generation == self.metadata_generation:
+                            requested.discard(row)
+                            if failures[row] <= self.REQUEUE_ROUNDS:
+                                self.metadata_queue.append(row)
+                    continue
+                wx.CallAfter(self.apply_metadata, generation, row, summary)
+
+    def apply_metadata(self, generation, row, summary):
+        """Store the header values of row, or None for a replay that could not be found or parsed"""
+        if not self or generation != self.metadata_generation:
+            return
+        values = None
+        if summary:
+            values = (summary['map'], summary['match_type'], self.format_players(summary['players']), summary['match_id'])
+        self.file_list.model.set_metadata(row, values)
+        self.file_list.Refresh()
+        if self.selection_keys:
+            self.remember_selection_summaries({self.file_list.model.get_text(row, 4): summary})
+
+    def run_in_pool(self, title, func, tasks, on_success):
+        """Run func over tasks in the io pool as a background job. on_success(results) is called on the GUI thread with
+        the results of each task as it completes. Transiently failed tasks are re-queued on their own, what still fails
+        is reported once the job is over and can be retried without fetching the rest again."""
+        def deliver(job, results):
+            if job in self.fetch_jobs:  # Dropped once a newer browse replaced the listing
+                on_success(results)
+
+        def run(job):
+            failures = []
+            pending = list(tasks)
+            for attempt in range(self.REQUEUE_ROUNDS + 1):
+                retry = []
+                for success, failure in worker_pool.imap_unordered('io', func, pending, cancel=job.cancel_event):
+                    if success:
+                        wx.CallAfter(deliver, job, success)
+                        job.update(done=1)
+                    else:
+                        (retry if failure['kind'] == 'transient' else failures).append(failure)
+                        job.update(failed=1, message=failure['label'])
+                if not retry or job.is_cancelled() or attempt == self.REQUEUE_ROUNDS:
+                    break
+                pending = [failure['task'] for failure in retry]
+                job.update(total=len(pending), message=f"Retrying {len(pending)}")
+            return failures + retry
+
+        job = self.jobs.submit(title, run, total=len(tasks),
+                               on_done=lambda job: wx.CallAfter(self.on_fetch_done, job, title, func, on_success))
+        self.fetch_jobs.append(job)
+        return job
+
+    def on_fetch_done(self, job, title, func, on_success):
+        if not self or job not in self.fetch_jobs:
+            return
+        self.fetch_jobs.remove(job)
+        if job.error:
+            wx.MessageBox(f"An error occurred: {job.error}", "Error", wx.OK | wx.ICON_ERROR)
+            return
+        if job.state == 'cancelled':
+            return
+        failures = job.result
+        if self.report_fetch_failures(failures):
+            self.run_in_pool(title, func, [failure['task'] for failure in failures if failure['kind'] != 'not_found'], on_success)
+
+    def report_fetch_failures(self, failures):
+        """Show what could not be fetched, returns True if the failed requests should be retried"""
+        not_found = sorted(failure['label'] for failure in failures if failure['kind'] == 'not_found')
+        failed = sorted((failure for failure in failures if failure['kind'] != 'not_found'), key=lambda failure: failure['label'])
+        if not_found:
+            wx.MessageBox(
+                f"No data found (404) for:\n{chr(10).join(not_found)}",
+                "Not Found", wx.OK | wx.ICON_WARNING
+            )
+        if not failed:
+            return False
+        lines = [f"{failure['label']}: {failure['detail']}" for failure in failed[:30]]
+        if len(failed) > 30:
+            lines.append(f"... and {len(failed) - 30} more")
+        with wx.MessageDialog(
+            self,
+            f"Failed to fetch data:\n\n{chr(10).join(lines)}\n\nRetry the {len(failed)} failed request(s)?",
+            "Error", wx.YES_NO | wx.ICON_ERROR
         ) as dlg:
-            success_files = []
-            error_404 = []
-            error_others = []
-            try:
-                with Pool(processes=10) as pool:
-                    for idx, result in enumerate(pool.imap_unordered(func, urls_to_process)):
-                        success, err_404, err_other = result
-                        if success:
-                            success_files.extend(success)
-                            dlg.Update(idx + 1, f"{success[0]} ({idx+1}/{len(urls_to_process)})")
-                        elif err_404:
-                            error_404.append(err_404)
-                            dlg.Update(idx + 1, f"{err_404} ({idx+1}/{len(urls_to_process)})")
-                        elif err_other:
-                            error_others.append(err_other)
-                            dlg.Update(idx + 1, f"{err_other} ({idx+1}/{len(urls_to_process)})")
-                        wx.Yield()
+            return dlg.ShowModal() == wx.ID_YES
 
-            except Exception as e:
-                wx.MessageBox(f"An error occurred: {e}", "Error", wx.OK | wx.ICON_ERROR)
-                return
-            error_404.sort()
-            error_others.sort()
-            if error_404:
-                wx.MessageBox(
-                    f"No data found (404) for:\n{chr(10).join(error_404)}",
-                    "Not Found", wx.OK | wx.ICON_WARNING
-                )
-            if error_others:
-                wx.MessageBox(
-                    f"Failed to fetch data:\n\n{chr(10).join(error_others)}",
-                    "Error", wx.OK | wx.ICON_ERROR
-                )
-            return success_files
+class RenamePlanDialog(wx.Dialog):
+    """Dry run of a batch rename, lists the planned new names before anything is renamed"""
+    def __init__(self, parent, changes, unchanged_count, errors):
+        super().__init__(parent, title="Rename Replays", size=(900, 500), style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+
+        summary = f"{len(changes)} file(s) will be renamed, {unchanged_count} already named correctly."
+        if errors:
+            summary += f" {len(errors)} file(s) could not be read and are skipped."
+        vbox.Add(wx.StaticText(self, label=summary), flag=wx.ALL, border=6)
+
+        self.plan_list = SortableListCtrl(self, [('Current Name', 420), ('New Name', 420)])
+        self.plan_list.set_rows(((old_name, new_name), None) for old_name, new_name in changes)
+        self.plan_list.append_rows(((filename, f"Skipped: {error}"), None) for filename, error in errors)
+        vbox.Add(self.plan_list, proportion=1, flag=wx.EXPAND | wx.LEFT | wx.RIGHT, border=6)
+
+        buttons = self.CreateStdDialogButtonSizer(wx.OK | wx.CANCEL)
+        ok_button = self.FindWindowById(wx.ID_OK)
+        ok_button.SetLabel("Rename")
+        ok_button.Enable(bool(changes))
+        vbox.Add(buttons, flag=wx.EXPAND | wx.ALL, border=6)
+
+        self.SetSizer(vbox)
+        self.CentreOnParent()
 
 class DirectorySelectionDialog(wx.Dialog):
     def __init__(self, parent, start_date, end_date):
@@ -1171,6 +1990,10 @@ class DirectorySelectionDialog(wx.Dialog):
         self.selection_label = wx.StaticText(self, label="Selected: 0")
         info_vbox.Add(self.selection_label, flag=wx.TOP | wx.RIGHT, border=5)
 
+        # Background refresh status of the directory database
+        self.refresh_label = wx.StaticText(self, label="")
+        info_vbox.Add(self.refresh_label, flag=wx.TOP | wx.RIGHT, border=5)
+
         # Add the info_vbox to your main vbox
         vbox.Add(info_vbox, flag=wx.EXPAND | wx.LEFT | wx.RIGHT | wx.BOTTOM, border=5)
 
@@ -1220,8 +2043,16 @@ class DirectorySelectionDialog(wx.Dialog):
 
         # Initialize database connection
         self.db = UserDirectoryDB()  # Our database helper class
+        self.refresher = wx.GetApp().directory_refresher
+        self.refresher.add_listener(self.on_database_updated)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
         self.check_database_and_load()
 
+    def on_destroy(self, event):
+        if event.GetEventObject() is self:
+            self.refresher.remove_listener(self.on_database_updated)
+        event.Skip()
+
     def on_left_click(self, event):
         """Toggle selection on left click"""
         pos = event.GetPosition()
@@ -1281,12 +2112,8 @@ class DirectorySelectionDialog(wx.Dialog):
 
     def populate_results(self):
         """Update results list and enable multi-selection"""
-        self.results_list.DeleteAllItems()
         # self.all_directories = directories
-        
-        for user_dir, count in self.all_directories:
-            idx = self.results_list.InsertItem(self.results_list.GetItemCount(), user_dir)
-            self.results_list.SetItem(idx, 1, str(count))
+        self.results_list.set_rows(((user_dir, count), None) for user_dir, count in self.all_directories)
         
         self.count_label.SetLabel(f"Found: {len(self.all_directories)}")
         self.selection_label.SetLabel("Selected: 0")
@@ -1311,309 +2138,236 @@ class DirectorySelectionDialog(wx.Dialog):
         # return self.db.query_users(self.start_date, self.end_date)
     
     def check_database_and_load(self):
-        with wx.ProgressDialog("Loading", "Checking database...", 
-                               parent=self, style=wx.PD_APP_MODAL) as pd:
-            try:
-                pd.Pulse("Verifying database...")
-                missing_dates = self.database_exists()
-                
-                if missing_dates:
-                    missing_dates = [d.strftime('%Y-%m-%d') for d in missing_dates]
-                    msg = "Database needs to update the directories for the following dates:\n"
-                    msg += "\n".join(missing_dates[:5])
-                    if len(missing_dates) > 5:
-                        msg += f"\n...and {len(missing_dates)-5} more"
-            except Exception as e:
-                wx.MessageBox(f"Error: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
-                return False
+        """Make sure missing dates are queued for the background refresher, the dialog never waits on it"""
+        try:
+            missing_dates = self.database_exists()
+        except Exception as e:
+            wx.MessageBox(f"Error: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
+            return False
         if missing_dates:
-            confirm = wx.MessageBox(
-                f"{msg}\n\nUpdate database now?",
-                "Database Update Needed",
-                wx.YES_NO | wx.ICON_QUESTION
-            )
-            
-            if confirm != wx.YES:
-                return False
-            
-            with wx.ProgressDialog("Updating", "Updating database...", 
-                                  parent=self, style=wx.PD_APP_MODAL) as update_pd:
-                try:
-                    self.update_database()
-                except Exception as e:
-                    wx.MessageBox(f"Error during update: {str(e)}", "Error", wx.OK | wx.ICON_ERROR)
-                    return False
-    
+            self.refresher.refresh()
+        self.update_refresh_status()
+
+    def on_database_updated(self):
+        if not self:
+            return  # Dialog was destroyed before the notification arrived
+        self.update_refresh_status()
+        # Pick up newly stored directories, unless that would throw away the user's selection.
+        if self.search_ctrl.GetValue().strip() and self.results_list.GetSelectedItemCount() == 0:
+            self.all_directories = self.query_directories(self.search_ctrl.GetValue().strip())
+            self.populate_results()
+
+    def update_refresh_status(self):
+        pending, failed = self.refresher.get_status()
+        if pending:
+            self.refresh_label.SetLabel(f"Updating directory database in background ({pending} day(s) remaining)...")
+        elif failed:
+            self.refresh_label.SetLabel(f"Directory database: {failed} day(s) could not be fetched, will retry")
+        else:
+            self.refresh_label.SetLabel("")
+
     def database_exists(self):
         """Check if we have data for this date range"""
         return self.db.has_data_for_range(self.start_date, self.end_date)
 
-    def update_database(self):
-        """Fetch data and update database"""
-        self.db.update_for_date_range(
-            start_date=self.start_date,
-            end_date=self.end_date
-        )
-
-class UserDirectoryDB:
-    def __init__(self):
-        self.conn = sqlite3.connect("player_directories.db")
-        self.cursor = self.conn.cursor()
-        self.create_tables()
-        self.dates_to_update = []
-
-    def create_tables(self):
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS directories (
-            user_id TEXT,
-            date TEXT,
-            PRIMARY KEY (user_id, date)
-        )""")
-        self.cursor.execute('''
-        CREATE TABLE IF NOT EXISTS status (
-            date TEXT CHECK(length(date) = 10) PRIMARY KEY,
-            is_complete INTEGER CHECK(is_complete IN (0, 1))
-        )
-        ''')
-        self.conn.commit()
-
-    def get_dates_between(self, start_date, end_date):
-        delta = end_date - start_date
-        return [start_date + timedelta(days=i) for i in range(delta.days + 1)]
-
-    def has_data_for_range(self, start_date, end_date):
-
-        # First delete any directory data 70 days older than today.
-        last_day = datetime.now(timezone.utc).date() - timedelta(days=71)
-        self.cursor.execute("DELETE FROM directories WHERE date < ?", (last_day.isoformat(),))
-        self.conn.commit()
-        
-        date_list = self.get_dates_between(date.fromisoformat(start_date), date.fromisoformat(end_date))
-        date_strs = [d.isoformat() for d in date_list]
-        placeholders = ','.join('?' for _ in date_strs)
-        query = f"SELECT date, is_complete FROM status WHERE date IN ({placeholders})"
-        self.cursor.execute(query, date_strs)
-        results = self.cursor.fetchall()
-        completed_dates = {row[0] for row in results if row[1] == 1}
-        dates_to_process = [d for d in date_strs if d not in completed_dates]
-        self.dates_to_update = [date.fromisoformat(s) for s in dates_to_process]
-
-        return self.dates_to_update
-
-    def update_for_date_range(self, start_date, end_date):
-        temp_folder_path = os.path.join(os.getcwd(), "temp")
+class DirectoryRefresher(threading.Thread):
+    """Keeps player_directories.db current for the whole 70-day window in the background"""
+    REFRESH_INTERVAL = 15 * 60  # Seconds between refreshes of the current UTC day
+
+    def __init__(self, jobs):
+        super().__init__(daemon=True)
+        self.jobs = jobs
+        self.writer = DirectoryDBWriter(on_commit=self.notify_listeners)
+        self.wake = threading.Event()
+        self.stopping = False
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.pending = 0
+        self.failed = 0
+
+    def refresh(self):
+        """Ask for a refresh now instead of waiting for the next interval"""
+        with self.lock:
+            if self.pending:
+                return  # Already working through the missing days
+        self.wake.set()
+
+    def stop(self):
+        self.stopping = True
+        self.wake.set()
+
+    def add_listener(self, callback):
+        """callback is called on the GUI thread whenever refreshed directories have been committed"""
+        with self.lock:
+            self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self.lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def notify_listeners(self):
+        with self.lock:
+            listeners = self.listeners[:]
+        for callback in listeners:
+            wx.CallAfter(callback)
+
+    def get_status(self):
+        with self.lock:
+            return self.pending, self.failed
+
+    def run(self):
+        self.writer.start()
+        db = UserDirectoryDB()
+        while not self.stopping:
+            self.wake.clear()
+            try:
+                self.refresh_window(db)
+            except Exception as e:
+                print(f"Error refreshing directory database: {e}")
+            self.wake.wait(self.REFRESH_INTERVAL)
+        db.conn.close()
+        self.writer.stop()
 
+    def refresh_window(self, db):
+        """Fetch the days that are missing or incomplete in the window, plus the current UTC day"""
+        today = datetime.now(timezone.utc).date()
+        first_day = today - timedelta(days=71)
+        dates = set(db.has_data_for_range(first_day.isoformat(), today.isoformat()))
+        dates.add(today)
+
+        base_url = GENTOOL_BASE_URL
+        urls_to_process = [
+            (f"{base_url}/{d.strftime("%Y_%m_%B/%d_%A")}/", d, db.get_validators(d.isoformat()))
+            for d in sorted(dates, reverse=True)
+        ]
+
+        with self.lock:
+            self.pending = len(urls_to_process)
+            self.failed = 0
+        self.notify_listeners()
+
+        job = self.jobs.add("Updating directory database", total=len(urls_to_process))
         try:
-            os.makedirs(temp_folder_path, exist_ok=True)
-        except OSError as e:
-            print(f"Error creating temporary folder: {e}")
-
-        base_url = "https://gentool.net/data/zh"
-        urls_to_process = []
-        for d in self.dates_to_update:
-            full_url = f"{base_url}/{d.strftime("%Y_%m_%B/%d_%A")}/"
-            urls_to_process.append((full_url, d))
-
-        success_files = run_in_pool(get_directories_worker, urls_to_process)
-
-        if success_files:
-            for given_date in success_files:
-                today_str = datetime.now(timezone.utc).date().isoformat()                
-                file_path = os.path.join(temp_folder_path, f"{given_date}.txt")
-                try:
-                    with open(file_path, 'r') as file:
-                        directories = [line.strip() for line in file if line.strip()]
-
-                    batch_data = [(directory, given_date) for directory in directories]
-                    
-                    self.cursor.execute("SELECT is_complete FROM status WHERE date = ?", (given_date,))
-                    row = self.cursor.fetchone()
-                    if given_date == today_str:
-                        if row is None:
-                            self.cursor.execute("INSERT INTO status (date, is_complete) VALUES (?, ?)", (given_date, 0))
-                        elif row[0] == 0:
-                            self.cursor.execute("DELETE FROM directories WHERE date = ?", (given_date,))
-                        self.cursor.executemany(
-                            "INSERT INTO directories (user_id, date) VALUES (?, ?)",
-                            batch_data
-                        )
-                    elif given_date < today_str:
-                        if row is None:
-                            self.cursor.execute("INSERT INTO status (date, is_complete) VALUES (?, ?)", (given_date, 1))
-                        elif row[0] == 0:
-                            self.cursor.execute("DELETE FROM directories WHERE date = ?", (given_date,))
-                            self.cursor.execute("UPDATE status SET is_complete = ? WHERE date = ?", (1, given_date))
-                        if row is None or row[0] == 0:    
-                            self.cursor.executemany(
-                                "INSERT INTO directories (user_id, date) VALUES (?, ?)",
-                                batch_data
-                            )
-                    os.remove(file_path)
-                    
-                except ValueError as e:
-                    print(f"Error parsing date from filename {file_path}: {e}")
-                except Exception as e:
-                    print(f"Error processing file {file_path}: {e}")
-            self.conn.commit()
-
-    def search_users(self, start_date, end_date, query):
-        """Search users with name matching query"""
-        query = query.split()
-        results = []
-        for uid in query:
-            query = """
-                SELECT user_id, COUNT(*) as days
-                FROM directories
-                WHERE date BETWEEN ? AND ?
-                AND user_id LIKE ?
-                GROUP BY user_id
-                ORDER BY days DESC
-            """
-            self.cursor.execute(query, (start_date, end_date, f"%{uid}%"))
-            results.extend(self.cursor.fetchall())
-
-        return results
-
-    def get_directory_dates_for_range(self, user_dirs, start_date, end_date):
-        dates_to_process = []
-        for udir in user_dirs:
-            self.cursor.execute("""
-                SELECT user_id, date
-                FROM directories
-                WHERE user_id = ?
-                  AND date BETWEEN ? AND ?
-                ORDER BY date
-            """, (udir, start_date, end_date))
-
-            dates_to_process.extend([(row[0], datetime.strptime(row[1], "%Y-%m-%d")) for row in self.cursor.fetchall()])
-
-        base_url = "https://gentool.net/data/zh"
-        urls_to_check = []
-        for udir, d in dates_to_process:
-            full_url = f"{base_url}/{d.strftime("%Y_%m_%B/%d_%A")}/{quote(udir)}"
-            urls_to_check.append((full_url, udir, d))
-        return urls_to_check
-
-
-def get_directories_worker(urls_to_process):
-    file_url, url_date = urls_to_process
-    formatted_date_path = url_date.strftime('%Y_%m_%B/%d_%A')
-    try:
-        response = requests.get(file_url)
-        if response.status_code != 200:
-            return ([], formatted_date_path if response.status_code == 404 else '', 
-                   '' if response.status_code == 404 else formatted_date_path)
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links = [a.get_text(strip=True) for a in soup.select('td a')]
-        
-        if links and len(links) > 1:
-            temp_dir = os.path.join(os.getcwd(), "temp")
-            os.makedirs(temp_dir, exist_ok=True)
-            date_string = url_date.strftime('%Y-%m-%d')
-            file_path = os.path.join(temp_dir, f"{date_string}.txt")
-            with open(file_path, 'w') as file:
-                file.writelines(f"{item}\n" for item in links[1:])
-            return ([date_string], '', '')
-        else:
-            return ([], '', formatted_date_path)
-            
-    except requests.RequestException:
-        return ([], '', formatted_date_path)
-    except Exception:
-        return ([], '', formatted_date_path)
-
-def get_dir_files_worker(urls_to_process):
-    dir_url, user_dir, url_date = urls_to_process
-    files_list = []
-    formatted_date_path = url_date.strftime('%Y_%m_%B/%d_%A')
-
-    try:
-        response = requests.get(dir_url)
-        if response.status_code != 200:
-            return (files_list, formatted_date_path if response.status_code == 404 else '', 
-                   '' if response.status_code == 404 else formatted_date_path)
-
-        if dir_url[-1] != '/':
-            dir_url += '/'
-        
-        doc = BeautifulSoup(response.content, "lxml")
-        rows = doc.find_all('tr')
+            for success, failure in worker_pool.imap_unordered('io', get_directories_worker, urls_to_process, cancel=job.cancel_event):
+                if self.stopping:
+                    break
+                with self.lock:
+                    self.pending -= 1
+                    if failure and failure['kind'] != 'not_found':
+                        self.failed += 1
+                job.update(done=1 if success else 0, failed=0 if success else 1)
+                # Listeners are notified by the writer once these rows are committed.
+                for given_date, directories, etag, last_modified in success:
+                    self.writer.submit('store_directories', given_date, directories, etag, last_modified)
+                if not success:
+                    self.notify_listeners()
+        finally:
+            job.finish()
+            with self.lock:
+                self.pending = 0  # Days skipped by a cancel are fetched again by the next refresh
+        self.notify_listeners()
 
-        for row in rows:
-            tds = row.find_all('td')
-            if len(tds) < 2:
-                continue
-            last_td_text = row.find_all('td')[-1].text.strip()
-            if last_td_text == 'Replay':
-                file_name = row.find('a').text
-                file_url = row.find('a')['href']
-                date_time = row.find_all('td')[2].text.strip()
-                file_size = row.find_all('td')[3].text.strip()
-                divisor = 1024
-                if 'K' in file_size:
-                    divisor = 1
-                elif 'M' in file_size:
-                    divisor = 1/1024
-                file_size_numeric = float(re.sub(r'[^\d.]', '', file_size))/divisor
-                
-                files_list.append([file_name, file_size_numeric, date_time, user_dir, f"{dir_url}{file_name}"])
-        return (files_list, '', '')
-    except Exception as e:
-        return (files_list, '', formatted_date_path)
-
-def download_reps_worker(args):
-    index, file_url, save_path = args
-    try:
-        response = requests.get(file_url)
-        # response.raise_for_status()
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
-        return (index, 'done')
-    except Exception as e:
-        return (index, f'error:{str(e)}')
-
-def run_in_pool(func, urls_to_process):    
-    with wx.ProgressDialog(
-        "Fetching data",
-        "Fetching...",
-        maximum=len(urls_to_process),
-        style=wx.PD_AUTO_HIDE | wx.PD_APP_MODAL
-    ) as dlg:
-        success_files = []
-        error_404 = []
-        error_others = []
-        try:
-            with Pool(processes=10) as pool:
-                for idx, result in enumerate(pool.imap_unordered(func, urls_to_process)):
-                    success, err_404, err_other = result
-                    if success:
-                        success_files.extend(success)
-                        dlg.Update(idx + 1, f"{success[0]} ({idx+1}/{len(urls_to_process)})")
-                    elif err_404:
-                        error_404.append(err_404)
-                        dlg.Update(idx + 1, f"{err_404} ({idx+1}/{len(urls_to_process)})")
-                    elif err_other:
-                        error_others.append(err_other)
-                        dlg.Update(idx + 1, f"{err_other} ({idx+1}/{len(urls_to_process)})")
-                    wx.Yield()
+class JobsPanel(wx.Panel):
+    """Non-modal progress of the running background jobs, with throughput and a cancel button per job"""
+    REFRESH_MS = 500  # Rates and elapsed times move on even when a job reports nothing
+    FINISHED_SHOW_MS = 4000  # Finished jobs stay listed this long
 
-        except Exception as e:
-            wx.MessageBox(f"An error occurred: {e}", "Error", wx.OK | wx.ICON_ERROR)
+    def __init__(self, parent, jobs):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.rows = {}  # job -> (row sizer, label, gauge, cancel button)
+        self.sizer = wx.BoxSizer(wx.VERTICAL)
+        self.SetSizer(self.sizer)
+        self.Hide()
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.on_destroy)
+        jobs.add_listener(self.on_job_changed)
+
+    def on_destroy(self, event):
+        if event.GetEventObject() is self:
+            self.jobs.remove_listener(self.on_job_changed)
+            self.timer.Stop()
+        event.Skip()
+
+    def on_job_changed(self, job):
+        """Called on the thread reporting the job"""
+        wx.CallAfter(self.update_job, job)
+
+    def on_timer(self, event):
+        for job in list(self.rows):
+            if not job.finished:
+                self.update_job(job)
+
+    def update_job(self, job):
+        if not self:
             return
-        error_404.sort()
-        error_others.sort()
-        if error_404:
-            wx.MessageBox(
-                f"No data found (404) for:\n{chr(10).join(error_404)}",
-                "Not Found", wx.OK | wx.ICON_WARNING
-            )
-        if error_others:
-            wx.MessageBox(
-                f"Failed to fetch data:\n\n{chr(10).join(error_others)}",
-                "Error", wx.OK | wx.ICON_ERROR
-            )
-        return success_files
+        row = self.rows.get(job)
+        if row is None:
+            row = self.add_row(job)
+        _, label, gauge, button = row
+        if job.total:
+            gauge.SetRange(job.total)
+            gauge.SetValue(min(job.done + job.failed, job.total))
+        elif not job.finished:
+            gauge.Pulse()
+        label.SetLabel(self.describe(job))
+        if job.finished or job.is_cancelled():
+            button.Disable()
+        if job.finished:
+            wx.CallLater(self.FINISHED_SHOW_MS, self.remove_row, job)
+
+    def describe(self, job):
+        parts = [job.title]
+        if job.total:
+            parts.append(f"{job.done + job.failed}/{job.total}")
+        if job.failed:
+            parts.append(f"{job.failed} failed")
+        items_per_second, bytes_per_second = job.rates()
+        parts.append(f"{items_per_second:.1f}/s")
+        if job.bytes:
+            parts.append(f"{bytes_per_second / 1048576:.2f} MB/s")
+        if job.state == 'failed':
+            parts.append(f"failed: {job.error}")
+        elif job.finished:
+            parts.append(job.state)
+        elif job.is_cancelled():
+            parts.append("cancelling...")
+        elif job.message:
+            parts.append(job.message)
+        return " - ".join(parts)
+
+    def add_row(self, job):
+        hbox = wx.BoxSizer(wx.HORIZONTAL)
+        gauge = wx.Gauge(self, range=max(job.total, 1), size=(150, -1))
+        label = wx.StaticText(self, label=job.title)
+        button = wx.Button(self, label="Cancel")
+        button.Bind(wx.EVT_BUTTON, lambda event: job.cancel())
+        hbox.Add(gauge, flag=wx.ALIGN_CENTER_VERTICAL | wx.ALL, border=2)
+        hbox.Add(label, proportion=1, flag=wx.ALIGN_CENTER_VERTICAL | wx.ALL, border=2)
+        hbox.Add(button, flag=wx.ALL, border=2)
+        self.sizer.Add(hbox, flag=wx.EXPAND)
+        self.rows[job] = (hbox, label, gauge, button)
+        self.relayout()
+        return self.rows[job]
+
+    def remove_row(self, job):
+        if not self or job not in self.rows:
+            return
+        hbox = self.rows.pop(job)[0]
+        hbox.Clear(delete_windows=True)
+        self.sizer.Remove(hbox)
+        self.relayout()
+
+    def relayout(self):
+        self.Show(bool(self.rows))
+        if self.rows:
+            if not self.timer.IsRunning():
+                self.timer.Start(self.REFRESH_MS)
+        else:
+            self.timer.Stop()
+        self.GetParent().Layout()
 
 class MyFrame(wx.Frame):
     def __init__(self, *args, **kw):
@@ -1625,6 +2379,12 @@ class MyFrame(wx.Frame):
         
         self.notebook.AddPage(self.tab1, "Local Replays")
         self.notebook.AddPage(self.tab2, "Gentool Replays")
+
+        self.jobs_panel = JobsPanel(self, wx.GetApp().jobs)
+        vbox = wx.BoxSizer(wx.VERTICAL)
+        vbox.Add(self.notebook, proportion=1, flag=wx.EXPAND)
+        vbox.Add(self.jobs_panel, flag=wx.EXPAND)
+        self.SetSizer(vbox)
         
         self.SetSize(1300, 700)
         self.SetTitle("Replay Info v1.1")
@@ -1633,5 +2393,25 @@ class MyFrame(wx.Frame):
 
 class ReplayViewer(wx.App):
     def OnInit(self):
+        self.jobs = jobs.JobManager()
+        self.directory_refresher = DirectoryRefresher(self.jobs)
+        self.replay_indexer = replay_index.ReplayIndexer()
+        self.replay_indexer.start()
         self.frame = MyFrame(None)
+        # The directory crawl starts its worker pool, keep that off the path to the first window
+        wx.CallAfter(self.directory_refresher.start)
         return True
+
+    def exit_when_shown(self, start_time):
+        """Print the time from start_time (a time.perf_counter value) to the first window, then exit"""
+        def report():
+            print(f"Time to first window: {time.perf_counter() - start_time:.3f}s")
+            self.frame.Close()
+        wx.CallAfter(report)
+
+    def OnExit(self):
+        self.jobs.cancel_all()
+        self.directory_refresher.stop()
+        self.replay_indexer.stop()
+        worker_pool.shutdown_pools()
+        return super().OnExit()
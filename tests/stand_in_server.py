@@ -0,0 +1,65 @@
+"""Local stand-in for the Gentool server with injectable latency, errors and body sizes, for the io limiter tests"""
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StandInServer(ThreadingHTTPServer):
+    """Answers every GET with body_size bytes after delay seconds. Statuses queued with fail() are answered
+    first, one per request. body_delay spreads the body over that many seconds after the headers were sent.
+    With truncate set, the connection is closed after that many bytes of the announced body."""
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.0, body_size=1024, body_delay=0.0):
+        super().__init__(('127.0.0.1', port), StandInHandler)
+        self.delay = delay
+        self.body_size = body_size
+        self.body_delay = body_delay
+        self.truncate = None
+        self.statuses = []
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def fail(self, status, count=1):
+        with self.lock:
+            self.statuses.extend([status] * count)
+
+    def next_status(self):
+        with self.lock:
+            self.requests += 1
+            return self.statuses.pop(0) if self.statuses else 200
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    CHUNK_SIZE = 16 * 1024
+
+    def do_GET(self):
+        server = self.server
+        status = server.next_status()
+        time.sleep(server.delay)
+        body = b"" if status != 200 else b"x" * server.body_size
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status == 200 and server.truncate is not None:
+            body = body[:server.truncate]
+            self.close_connection = True
+        chunks = range(0, len(body), self.CHUNK_SIZE)
+        for start in chunks:
+            self.wfile.write(body[start:start + self.CHUNK_SIZE])
+            if server.body_delay:
+                self.wfile.flush()
+                time.sleep(server.body_delay / len(chunks))
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,112 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+import workers
+import worker_pool
+from worker_pool import AdaptiveLimiter
+from tests.stand_in_server import StandInServer
+
+def get_listing(url):
+    try:
+        return workers.fetch(url).status_code
+    except workers.FetchError as e:
+        return e.kind
+
+def get_replay(url):
+    with workers.fetch(url, stream=True, request_class='replay') as response:
+        return len(response.content)
+
+def run_tasks(limiter, func, url, count):
+    """Run func(url) count times one after another under limiter, as the io pool dispatch does"""
+    results = []
+    for _ in range(count):
+        while not limiter.try_acquire():
+            limiter.wait()
+        result, stats = worker_pool._run_measured(func, url)
+        limiter.release(stats)
+        results.append(result)
+    return results
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer().start()
+        self.url = self.server.base_url + "/replay.rep"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_limit_grows_with_healthy_responses(self):
+        limiter = AdaptiveLimiter(initial=4)
+        run_tasks(limiter, get_listing, self.url, 30)
+        self.assertGreater(limiter.limit, 8)
+
+    def test_limit_halves_on_throttling_and_server_errors(self):
+        limiter = AdaptiveLimiter(initial=8)
+        for status in (429, 503):
+            limit = limiter.limit
+            self.server.fail(status)
+            with mock.patch.object(workers, 'MAX_RETRIES', 0):
+                self.assertEqual(run_tasks(limiter, get_listing, self.url, 1), ['transient'])
+            self.assertEqual(limiter.limit, limit / 2)
+            limiter.decreased_at = 0  # Not part of the same burst
+
+    def test_limit_halves_when_latency_climbs(self):
+        limiter = AdaptiveLimiter(initial=8)
+        run_tasks(limiter, get_listing, self.url, 10)
+        limit = limiter.limit
+        self.server.delay = 0.3
+        run_tasks(limiter, get_listing, self.url, 1)
+        self.assertEqual(limiter.limit, limit / 2)
+
+    def test_jitter_on_a_fast_link_is_not_congestion(self):
+        limiter = AdaptiveLimiter(initial=8)
+        limiter.observe('listing', 0.002, 200, 0)
+        limiter.observe('listing', 0.05, 200, 0)
+        self.assertGreater(limiter.limit, 8)
+
+    def test_large_downloads_are_not_congestion(self):
+        limiter = AdaptiveLimiter(initial=8)
+        run_tasks(limiter, get_listing, self.url, 10)
+        limit = limiter.limit
+        self.server.body_size = 400 * 1024
+        self.server.body_delay = 0.2
+        self.assertEqual(run_tasks(limiter, get_replay, self.url, 5), [400 * 1024] * 5)
+        self.assertGreater(limiter.limit, limit)
+
+    def test_bandwidth_cap_delays_dispatch(self):
+        self.server.body_size = 100 * 1024
+        started = time.monotonic()
+        run_tasks(AdaptiveLimiter(), get_replay, self.url, 5)
+        uncapped = time.monotonic() - started
+
+        started = time.monotonic()
+        run_tasks(AdaptiveLimiter(bandwidth=200 * 1024), get_replay, self.url, 5)
+        capped = time.monotonic() - started
+        # 500 KiB at 200 KiB/s, of which the first 200 KiB are the initial budget
+        self.assertGreater(capped, 0.8)
+        self.assertLess(uncapped, 0.5)
+
+class IoPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(body_size=4096).start()
+
+    def tearDown(self):
+        worker_pool.shutdown_pools()
+        self.server.stop()
+
+    def test_pool_workers_report_their_requests(self):
+        limiter = AdaptiveLimiter(initial=2)
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(worker_pool, 'io_limiter', limiter), \
+                mock.patch.object(limiter, 'observe', wraps=limiter.observe) as observe:
+            tasks = [(i, f"{self.server.base_url}/{i}.rep", os.path.join(directory, f"{i}.rep")) for i in range(20)]
+            results = sorted(worker_pool.imap_unordered('io', workers.download_reps_worker, tasks))
+            self.assertEqual(results, [(i, 'done') for i in range(20)])
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertEqual([(call.args[0], call.args[2], call.args[3]) for call in observe.call_args_list],
+                         [('replay', 200, 4096)] * 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone, timedelta
+
+import directory_db
+from workers import GENTOOL_BASE_URL
+
+TODAY = datetime.now(timezone.utc).date()
+YESTERDAY = TODAY - timedelta(days=1)
+
+class UserDirectoryDBTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp = tempfile.TemporaryDirectory()
+        os.chdir(self.temp.name)  # player_directories.db is created in the working directory
+        self.db = directory_db.UserDirectoryDB()
+
+    def tearDown(self):
+        self.db.conn.close()
+        os.chdir(self.cwd)
+        self.temp.cleanup()
+
+    def directories(self, date_str):
+        self.db.cursor.execute("SELECT user_id FROM directories WHERE date = ? ORDER BY user_id", (date_str,))
+        return [row[0] for row in self.db.cursor.fetchall()]
+
+    def test_listings_of_the_current_day_are_added_to(self):
+        today = TODAY.isoformat()
+        self.db.store_directories(today, ["b", "a"], '"1"', "Mon")
+        self.db.store_directories(today, ["a", "c", "b", "c"], '"2"', None)
+        self.assertEqual(self.directories(today), ["a", "b", "c"])
+        self.assertEqual(self.db.get_validators(today), ('"2"', "Mon"))
+        self.assertEqual(self.db.has_data_for_range(today, today), [TODAY])
+
+    def test_not_modified_keeps_directories_and_validators(self):
+        today = TODAY.isoformat()
+        self.db.store_directories(today, ["a"], '"1"', "Mon")
+        self.db.store_directories(today, None)
+        self.assertEqual(self.directories(today), ["a"])
+        self.assertEqual(self.db.get_validators(today), ('"1"', "Mon"))
+
+    def test_finished_days_are_not_rewritten(self):
+        yesterday = YESTERDAY.isoformat()
+        self.db.store_directories(yesterday, ["a"])
+        self.db.store_directories(yesterday, ["b"])
+        self.assertEqual(self.directories(yesterday), ["a"])
+        self.assertEqual(self.db.has_data_for_range(yesterday, yesterday), [])
+
+    def test_search_ranks_users_matching_more_tokens_first(self):
+        for day in (YESTERDAY, TODAY):
+            self.db.store_directories(day.isoformat(), ["sniper_fox", "fox_hound", "sniper_wolf", "other"])
+        self.db.store_directories((TODAY - timedelta(days=2)).isoformat(), ["fox_hound"])
+        results = self.db.search_users((TODAY - timedelta(days=2)).isoformat(), TODAY.isoformat(), "sniper fox fox")
+        self.assertEqual(results, [("sniper_fox", 2), ("fox_hound", 3), ("sniper_wolf", 2)])
+        self.assertEqual(self.db.search_users(TODAY.isoformat(), TODAY.isoformat(), "hound"), [("fox_hound", 1)])
+        self.assertEqual(self.db.search_users(TODAY.isoformat(), TODAY.isoformat(), "  "), [])
+
+    def test_search_matches_any_token_literally(self):
+        today = TODAY.isoformat()
+        self.db.store_directories(today, ["a_b", "axb", "100%", "1000", "fox"])
+        self.assertEqual(self.db.search_users(today, today, "a_"), [("a_b", 1)])
+        self.assertEqual(self.db.search_users(today, today, "0%"), [("100%", 1)])
+        self.assertEqual(self.db.search_users(today, today, "fox a_"), [("a_b", 1), ("fox", 1)])
+
+    def test_directory_urls_follow_the_selection_order(self):
+        for day in (YESTERDAY, TODAY):
+            self.db.store_directories(day.isoformat(), ["a b", "c"])
+        urls = self.db.get_directory_dates_for_range(["c", "a b"], YESTERDAY.isoformat(), TODAY.isoformat())
+        expected = []
+        for user_dir, quoted in (("c", "c"), ("a b", "a%20b")):
+            for day in (YESTERDAY, TODAY):
+                day_time = datetime(day.year, day.month, day.day)
+                expected.append((f"{GENTOOL_BASE_URL}/{day_time.strftime('%Y_%m_%B/%d_%A')}/{quoted}", user_dir, day_time))
+        self.assertEqual(urls, expected)
+
+    def test_final_listings_include_empty_directories(self):
+        yesterday, today = YESTERDAY.isoformat(), TODAY.isoformat()
+        files = [["1.rep", 12.5, "2024-01-01 10:00", "a", "http://example/a/1.rep"]]
+        self.db.store_listing("a", yesterday, files)
+        self.db.store_listing("b", yesterday, [])
+        self.db.store_listing("a", today, files)  # The day is not over, so its listing is not final
+        listings = self.db.get_final_listings([("a", yesterday), ("b", yesterday), ("a", today), ("c", yesterday)])
+        self.assertEqual(listings, {("a", yesterday): files, ("b", yesterday): []})
+
+class DirectoryDBWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp = tempfile.TemporaryDirectory()
+        os.chdir(self.temp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp.cleanup()
+
+    def test_queued_writes_are_committed(self):
+        commits = []
+        writer = directory_db.DirectoryDBWriter(on_commit=lambda: commits.append(True))
+        writer.start()
+        writer.submit('store_directories', TODAY.isoformat(), ["a"])
+        writer.stop()
+        writer.join()
+        db = directory_db.UserDirectoryDB()
+        try:
+            self.assertEqual(db.search_users(TODAY.isoformat(), TODAY.isoformat(), "a"), [("a", 1)])
+        finally:
+            db.conn.close()
+        self.assertTrue(commits)
+
+if __name__ == '__main__':
+    unittest.main()
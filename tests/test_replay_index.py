@@ -0,0 +1,145 @@
+import os
+import queue
+import tempfile
+import unittest
+
+import worker_pool
+import replay_index
+
+SUMMARY = {'match_id': '', 'map': '', 'match_type': '', 'match_mode': '', 'result': '', 'players': []}
+
+class ReplayIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp = tempfile.TemporaryDirectory()
+        os.chdir(self.temp.name)  # replay_index.db is created in the working directory
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp.cleanup()
+
+    def make_directory(self, name, count):
+        directory = os.path.join(self.temp.name, name)
+        os.mkdir(directory)
+        entries = []
+        for i in range(count):
+            path = os.path.join(directory, f"{i}.rep")
+            with open(path, 'wb') as f:
+                f.write(b"not a replay")
+            stat = os.stat(path)
+            entries.append((f"{i}.rep", stat.st_size, stat.st_mtime))
+        return directory, entries
+
+class ReplayIndexDBTest(ReplayIndexTest):
+    def setUp(self):
+        super().setUp()
+        self.db = replay_index.ReplayIndexDB()
+
+    def tearDown(self):
+        self.db.conn.close()
+        super().tearDown()
+
+    def stored(self):
+        self.db.cursor.execute("SELECT name, summary FROM replays")
+        return dict(self.db.cursor.fetchall())
+
+    def test_renamed_replay_keeps_its_row(self):
+        self.db.sync_directory("replays", [("a.rep", 10, 1.0)])
+        self.db.store_summaries("replays", [("a.rep", 10, 1.0, SUMMARY)])
+        self.assertEqual(self.db.sync_directory("replays", [("b.rep", 10, 1.0)]), [])
+        self.assertEqual(list(self.stored()), ["b.rep"])
+
+    def test_shared_stamps_are_not_taken_for_renames(self):
+        self.db.sync_directory("replays", [("a.rep", 10, 1.0), ("b.rep", 10, 1.0)])
+        self.db.store_summaries("replays", [("a.rep", 10, 1.0, dict(SUMMARY, match_id='a')),
+                                            ("b.rep", 10, 1.0, dict(SUMMARY, match_id='b'))])
+        self.assertEqual(self.db.sync_directory("replays", [("x.rep", 10, 1.0)]), [("x.rep", 10, 1.0)])
+        self.assertEqual(self.stored(), {})
+
+class ReplayIndexSearchTest(ReplayIndexTest):
+    def setUp(self):
+        super().setUp()
+        self.db = replay_index.ReplayIndexDB()
+        self.db.store_summaries("replays", [
+            ("a.rep", 10, 1.0, self.summary('1500', 'Tournament Desert', 'Sniper', 'USA')),
+            ("b.rep", 20, 1.0, self.summary('1600', 'Tournament Island "B"', 'Fox_50%', 'China')),
+        ])
+        self.db.store_summaries("other", [("c.rep", 10, 1.0, self.summary('1700', 'Tournament Desert', 'Sniper', 'USA'))])
+
+    def tearDown(self):
+        self.db.conn.close()
+        super().tearDown()
+
+    def summary(self, match_id, map_name, player, faction):
+        return dict(SUMMARY, match_id=match_id, map=map_name,
+                    players=[{'name': player, 'faction': faction, 'faction_short': faction}])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.db.search("replays", "tournament"), {"a.rep", "b.rep"})
+        self.assertEqual(self.db.search("replays", "Tournament desert sniper"), {"a.rep"})
+        self.assertEqual(self.db.search("replays", "desert china"), set())
+        self.assertEqual(self.db.search("replays", " "), set())
+
+    def test_short_tokens_and_wildcards_are_matched_literally(self):
+        self.assertEqual(self.db.search("replays", "us tour"), {"a.rep"})
+        self.assertEqual(self.db.search("replays", "_5"), {"b.rep"})
+        self.assertEqual(self.db.search("replays", "0%"), {"b.rep"})
+        self.assertEqual(self.db.search("replays", '"b"'), {"b.rep"})
+
+    def test_changed_and_removed_replays_stay_searchable(self):
+        self.db.store_summaries("replays", [("a.rep", 11, 2.0, self.summary('1500', 'Lone Oak', 'Sniper', 'USA'))])
+        self.assertEqual(self.db.search("replays", "desert"), set())
+        self.assertEqual(self.db.search("replays", "oak"), {"a.rep"})
+        self.db.sync_directory("replays", [("a.rep", 11, 2.0)])
+        self.assertEqual(self.db.search("replays", "tournament"), set())
+
+class SummarizeReplaysTest(unittest.TestCase):
+    def game(self, match_id, winning_team, duration_frames):
+        players = [{'name': 'Bob', 'faction': 'USA', 'team': 1}, {'name': 'Al', 'faction': 'China', 'team': 2},
+                   {'name': 'Eve', 'faction': 'Observer', 'team': 3}]
+        return dict(SUMMARY, match_id=match_id, map='Desert', winning_team=winning_team, duration_frames=duration_frames,
+                    players=players)
+
+    def test_copies_of_a_game_count_once(self):
+        stats = replay_index.summarize_replays([self.game('a', 'Unknown', 900), self.game('a', '1', 600), self.game('b', '2', 300)])
+        self.assertEqual(stats['games'], 2)
+        self.assertEqual(stats['no_result'], 0)
+        self.assertEqual(stats['duration_frames'], 900)
+        self.assertEqual(stats['players'], {'Bob': [2, 1, 1], 'Al': [2, 1, 1]})
+        self.assertEqual(stats['factions'], {'USA': 2, 'China': 2})
+        self.assertEqual(stats['maps'], {'Desert': 2})
+
+    def test_unknown_durations_are_left_out(self):
+        stats = replay_index.summarize_replays([self.game('a', '', None), self.game('b', '', 300)])
+        self.assertEqual((stats['games'], stats['no_result'], stats['no_duration'], stats['duration_frames']), (2, 2, 1, 300))
+        self.assertEqual(stats['players'], {'Bob': [2, 0, 0], 'Al': [2, 0, 0]})
+
+class ReplayIndexerTest(ReplayIndexTest):
+    def tearDown(self):
+        worker_pool.shutdown_pools()
+        super().tearDown()
+
+    def test_newly_opened_directory_is_indexed_first(self):
+        old_directory, old_entries = self.make_directory("old", 3000)
+        new_directory, new_entries = self.make_directory("new", 20)
+        progress = queue.Queue()
+        indexer = replay_index.ReplayIndexer()
+        indexer.add_listener(lambda directory, done, total, summaries: progress.put((directory, done, total)))
+        indexer.start()
+        try:
+            indexer.index_directory(old_directory, old_entries)
+            while progress.get(timeout=30)[1] == 0:
+                pass  # Wait until the old directory is being parsed
+            indexer.index_directory(new_directory, new_entries)
+            finished = []
+            while len(finished) < 2:
+                directory, done, total = progress.get(timeout=60)
+                if done == total:
+                    finished.append(directory)
+            self.assertEqual(finished, [new_directory, old_directory])
+        finally:
+            indexer.stop()
+            indexer.join(timeout=30)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+import workers
+from tests.stand_in_server import StandInServer
+
+class FetchTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer(body_size=100000).start()
+        self.url = self.server.base_url + "/replay.rep"
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_truncated_body_is_transient(self):
+        self.server.truncate = 1000
+        with mock.patch.object(workers, 'MAX_RETRIES', 0):
+            with self.assertRaises(workers.FetchError) as raised:
+                workers.fetch(self.url)
+        self.assertEqual(raised.exception.kind, 'transient')
+
+    def test_truncated_stream_is_transient(self):
+        self.server.truncate = 1000
+        with self.assertRaises(workers.FetchError) as raised:
+            workers.download_replay(self.url)
+        self.assertEqual(raised.exception.kind, 'transient')
+
+    def test_truncated_download_reports_transient(self):
+        self.server.truncate = 1000
+        with mock.patch.object(workers, 'MAX_RETRIES', 0):
+            self.assertEqual(workers.download_reps_worker((0, self.url, None))[1][:16], 'error:transient:')
+
+    def test_header_worker_reports_the_failure_kind(self):
+        self.assertEqual(workers.get_replay_header_worker((0, self.url)), (0, None, 'permanent'))  # Not a replay
+        self.server.fail(404)
+        self.assertEqual(workers.get_replay_header_worker((1, self.url)), (1, None, 'not_found'))
+        self.server.truncate = 1000
+        self.assertEqual(workers.get_replay_header_worker((2, self.url)), (2, None, 'transient'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import os
+import time
+import queue
+import threading
+
+POOL_SIZES = {
+    'io': 16,  # Crawling and downloads mostly wait on the network, the adaptive limiter decides how many run
+    'cpu': os.cpu_count() or 1,  # Replay parsing
+}
+
+_pools = {}
+_lock = threading.Lock()
+_startup_seconds = None  # Set in each worker process by _record_startup
+
+def _record_startup(created_at):
+    global _startup_seconds
+    _startup_seconds = time.time() - created_at
+
+def _get_startup(_):
+    time.sleep(0.05)  # Keep this worker busy so the other probes reach the other workers
+    return os.getpid(), _startup_seconds
+
+_fetch_stats = None  # (request class, latency, status, size) of the requests made by the running io task, in a worker process
+
+def record_fetch(request_class, latency, status, size):
+    """Called by workers.fetch for every request attempt, status is None for connection errors and timeouts"""
+    if _fetch_stats is not None:
+        _fetch_stats.append((request_class, latency, status, size))
+
+def _run_measured(func, item):
+    global _fetch_stats
+    _fetch_stats = []
+    try:
+        return func(item), _fetch_stats
+    finally:
+        _fetch_stats = None
+
+class AdaptiveLimiter:
+    """Limits the io tasks in flight across all callers. The limit grows by one per window of healthy
+    responses and is halved on 429/5xx, connection errors and timeouts, or when latency climbs well above
+    the best seen for the same request class (AIMD). Latency is the time to the response headers.
+    An optional bandwidth cap (bytes per second) delays dispatch while over budget."""
+    LATENCY_FACTOR = 3  # Latency above this multiple of the baseline counts as congestion
+    LATENCY_SLACK = 0.1  # Seconds above the baseline that are always tolerated, jitter on a fast link is not congestion
+
+    def __init__(self, minimum=1, maximum=POOL_SIZES['io'], initial=4, bandwidth=0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(initial)
+        self.bandwidth = bandwidth
+        self.tokens = float(bandwidth)
+        self.refilled_at = time.monotonic()
+        self.in_flight = 0
+        self.baselines = {}  # Request class -> slowly forgetting minimum of its latency
+        self.decreased_at = 0.0
+        self.condition = threading.Condition()
+
+    def try_acquire(self):
+        with self.condition:
+            self.refill()
+            if self.in_flight >= int(self.limit) or self.tokens < 0:
+                return False
+            self.in_flight += 1
+            return True
+
+    def wait(self, timeout=0.1):
+        """Block until a task finished or timeout passed, dispatch is then worth trying again"""
+        with self.condition:
+            self.condition.wait(timeout)
+
+    def release(self, stats):
+        with self.condition:
+            self.in_flight -= 1
+            for request_class, latency, status, size in stats:
+                self.observe(request_class, latency, status, size)
+            self.condition.notify_all()
+
+    def observe(self, request_class, latency, status, size):
+        if self.bandwidth:
+            self.tokens -= size
+        baseline = self.baselines.get(request_class)
+        if status is None or status == 429 or status >= 500:
+            self.decrease(baseline)
+            return
+        if baseline is None or latency < baseline:
+            self.baselines[request_class] = latency
+        else:
+            self.baselines[request_class] = baseline * 0.99 + latency * 0.01
+        if baseline is not None and latency > max(baseline * self.LATENCY_FACTOR, baseline + self.LATENCY_SLACK):
+            self.decrease(baseline)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def decrease(self, baseline):
+        # A burst of failures from the same congested moment only halves the limit once
+        now = time.monotonic()
+        if now - self.decreased_at < (baseline or 1):
+            return
+        self.decreased_at = now
+        self.limit = max(self.minimum, self.limit / 2)
+
+    def refill(self):
+        if not self.bandwidth:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.bandwidth, self.tokens + (now - self.refilled_at) * self.bandwidth)
+        self.refilled_at = now
+
+io_limiter = AdaptiveLimiter(bandwidth=int(os.environ.get('GENTOOL_BANDWIDTH_LIMIT', 0)) * 1024)
+
+def get_pool(kind):
+    """Return the shared process pool for kind ('io' or 'cpu'), creating it on first use"""
+    with _lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            from multiprocessing import Pool
+            pool = _pools[kind] = Pool(processes=POOL_SIZES[kind], initializer=_record_startup, initargs=(time.time(),))
+        return pool
+
+def imap_unordered(kind, func, items, chunksize=1, cancel=None):
+    """Pool.imap_unordered on the shared pool of kind. Items are submitted in bounded batches, so once
+    cancel (a threading.Event) is set no further work is queued on a pool that other operations share.
+    io work is dispatched one task at a time under io_limiter instead."""
+    if kind == 'io':
+        yield from _imap_limited(func, items, cancel)
+        return
+    items = list(items)
+    batch_size = POOL_SIZES[kind] * chunksize * 4
+    pool = get_pool(kind)
+    for start in range(0, len(items), batch_size):
+        if cancel is not None and cancel.is_set():
+            return
+        yield from pool.imap_unordered(func, items[start:start + batch_size], chunksize)
+
+def _imap_limited(func, items, cancel):
+    pool = get_pool('io')
+    results = queue.Queue()
+    items = iter(items)
+    pending = 0
+    exhausted = False
+
+    def on_result(result):
+        value, stats = result
+        io_limiter.release(stats)  # Released here so abandoned iterations do not leak capacity
+        results.put((True, value))
+
+    def on_error(error):
+        io_limiter.release([])
+        results.put((False, error))
+
+    while True:
+        while not exhausted and not (cancel is not None and cancel.is_set()) and io_limiter.try_acquire():
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                io_limiter.release([])
+                break
+            pool.apply_async(_run_measured, (func, item), callback=on_result, error_callback=on_error)
+            pending += 1
+        if pending == 0:
+            if exhausted or (cancel is not None and cancel.is_set()):
+                return
+            io_limiter.wait()  # At the limit with other callers' tasks, or over the bandwidth budget
+            continue
+        ok, value = results.get()
+        pending -= 1
+        if not ok:
+            raise value
+        yield value
+
+def worker_startup_times(kind):
+    """Return {pid: seconds} from creating the pool of kind until each worker was ready for tasks"""
+    pool = get_pool(kind)
+    return dict(pool.map(_get_startup, range(POOL_SIZES[kind] * 4), chunksize=1))
+
+def shutdown_pools():
+    """Stop all worker processes, called when the app exits"""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.terminate()
+        pool.join()
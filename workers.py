@@ -0,0 +1,228 @@
+# Tasks run in the worker pools. Under the spawn start method every pool worker imports this module,
+# so it must not import wx or replay_viewer, and requests/bs4 are only loaded by the tasks that use them.
+import os
+import re
+import time
+import random
+
+import replay_result
+import worker_pool
+
+# Overridable so crawling and downloads can be tested against a local stand-in server
+GENTOOL_BASE_URL = os.environ.get('GENTOOL_BASE_URL', 'https://gentool.net/data/zh').rstrip('/')
+
+REQUEST_TIMEOUT = (10, 30)  # Seconds to connect and between received bytes
+MAX_RETRIES = 3  # Retries of a transient failure before it is reported
+BACKOFF_BASE = 1  # Seconds before the first retry, doubled for each further retry
+BACKOFF_MAX = 30
+HEADER_BYTES = 16 * 1024  # Start of a replay fetched for its metadata, the header plus the first frames
+
+class FetchError(Exception):
+    """A request that failed for good, kind is 'not_found', 'transient' (retries exhausted) or 'permanent'"""
+    def __init__(self, url, kind, detail):
+        super().__init__(f"{detail} ({url})")
+        self.url = url
+        self.kind = kind
+        self.detail = detail
+
+def classify_status(status_code):
+    if status_code in (404, 410):
+        return 'not_found'
+    if status_code in (408, 429) or status_code >= 500:
+        return 'transient'
+    return 'permanent'
+
+def transient_errors():
+    """requests exceptions worth retrying: connection errors, timeouts and bodies cut off or garbled in transfer"""
+    import requests
+    return (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+            requests.exceptions.ContentDecodingError)
+
+def fetch(url, headers=None, stream=False, request_class='listing'):
+    """GET url with timeouts, retrying connection errors, timeouts, truncated bodies, 429 and 5xx with exponential backoff.
+    Returns the response (including 304 Not Modified), raises FetchError once the request has failed for good.
+    request_class ('listing', 'header' or 'replay') groups the requests whose latencies are compared by the io limiter."""
+    import requests
+    for attempt in range(MAX_RETRIES + 1):
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        started = time.monotonic()
+        try:
+            response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+            if not stream:
+                response.content  # Read the body here, so a connection dropped mid-transfer is retried
+        except transient_errors() as e:
+            worker_pool.record_fetch(request_class, time.monotonic() - started, None, 0)
+            kind, detail = 'transient', type(e).__name__
+        except requests.RequestException as e:
+            raise FetchError(url, 'permanent', str(e))
+        else:
+            size = int(response.headers.get('Content-Length') or 0) if stream else len(response.content)
+            # Time to the response headers and the status feed the adaptive limit of the io pool, the body
+            # transfer is left out so large downloads do not read as congestion
+            worker_pool.record_fetch(request_class, response.elapsed.total_seconds(), response.status_code, size)
+            if response.status_code < 400:
+                return response
+            kind, detail = classify_status(response.status_code), f"HTTP {response.status_code}"
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = min(BACKOFF_MAX, int(retry_after))
+            response.close()
+        if kind != 'transient':
+            raise FetchError(url, kind, detail)
+        if attempt == MAX_RETRIES:
+            raise FetchError(url, kind, f"{detail} after {attempt + 1} attempts")
+        # Jitter keeps the pool workers from retrying in lockstep
+        time.sleep(random.uniform(delay / 2, delay))
+
+def iter_body(url, response, chunk_size):
+    """response.iter_content of a streamed fetch, raises FetchError 'transient' if the body is cut off"""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    except transient_errors() as e:
+        raise FetchError(url, 'transient', type(e).__name__)
+
+def fetch_failure(task, label, error):
+    """Structured failure report of a pool task, task is what to re-queue to retry it"""
+    return {'task': task, 'label': label, 'url': error.url, 'kind': error.kind, 'detail': error.detail}
+
+def get_directories_worker(urls_to_process):
+    """Fetch the player directory listing of one day, returns (success, failure)"""
+    from bs4 import BeautifulSoup
+    file_url, url_date, (etag, last_modified) = urls_to_process
+    formatted_date_path = url_date.strftime('%Y_%m_%B/%d_%A')
+    date_string = url_date.strftime('%Y-%m-%d')
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    try:
+        response = fetch(file_url, headers=headers)
+        if response.status_code == 304:
+            return ([(date_string, None, etag, last_modified)], None)
+        
+        soup = BeautifulSoup(response.text, 'html.parser')
+        links = [a.get_text(strip=True) for a in soup.select('td a')]
+        
+        if links and len(links) > 1:
+            return ([(date_string, links[1:], response.headers.get('ETag'), response.headers.get('Last-Modified'))], None)
+        else:
+            return ([], fetch_failure(urls_to_process, formatted_date_path, FetchError(file_url, 'permanent', "No directories listed")))
+            
+    except FetchError as e:
+        return ([], fetch_failure(urls_to_process, formatted_date_path, e))
+    except Exception as e:
+        return ([], fetch_failure(urls_to_process, formatted_date_path, FetchError(file_url, 'permanent', str(e))))
+
+def get_dir_files_worker(urls_to_process):
+    """List the replays in one player directory, returns (success, failure).
+    success holds one (user dir, date, files) listing, which is stored so final days are not fetched again."""
+    from bs4 import BeautifulSoup
+    dir_url, user_dir, url_date = urls_to_process
+    files_list = []
+    label = f"{url_date.strftime('%Y_%m_%B/%d_%A')} ({user_dir})"
+
+    try:
+        response = fetch(dir_url)
+
+        if dir_url[-1] != '/':
+            dir_url += '/'
+        
+        doc = BeautifulSoup(response.content, "lxml")
+        rows = doc.find_all('tr')
+
+        for row in rows:
+            tds = row.find_all('td')
+            if len(tds) < 2:
+                continue
+            last_td_text = row.find_all('td')[-1].text.strip()
+            if last_td_text == 'Replay':
+                file_name = row.find('a').text
+                file_url = row.find('a')['href']
+                date_time = row.find_all('td')[2].text.strip()
+                file_size = row.find_all('td')[3].text.strip()
+                divisor = 1024
+                if 'K' in file_size:
+                    divisor = 1
+                elif 'M' in file_size:
+                    divisor = 1/1024
+                file_size_numeric = float(re.sub(r'[^\d.]', '', file_size))/divisor
+                
+                files_list.append([file_name, file_size_numeric, date_time, user_dir, f"{dir_url}{file_name}"])
+        return ([(user_dir, url_date.strftime('%Y-%m-%d'), files_list)], None)
+    except FetchError as e:
+        return ([], fetch_failure(urls_to_process, label, e))
+    except Exception as e:
+        return ([], fetch_failure(urls_to_process, label, FetchError(dir_url, 'permanent', str(e))))
+
+def download_replay(url, cancel=None):
+    """Download a replay into memory in chunks, returns None if cancel is set before it completes"""
+    chunks = []
+    with fetch(url, stream=True, request_class='replay') as response:
+        for chunk in iter_body(url, response, 64 * 1024):
+            if cancel is not None and cancel.is_set():
+                return None
+            chunks.append(chunk)
+    return b"".join(chunks)
+
+def get_replay_header_worker(args):
+    """Range-fetch the start of an online replay and parse its header, returns (row, summary, failure).
+    If the replay could not be fetched or parsed, summary is None and failure the FetchError kind,
+    'permanent' for replays that could not be parsed."""
+    row, url = args
+    try:
+        chunks = []
+        received = 0
+        # Servers that ignore the range send the whole replay, the rest of it is not read
+        with fetch(url, headers={'Range': f'bytes=0-{HEADER_BYTES - 1}'}, stream=True, request_class='header') as response:
+            for chunk in iter_body(url, response, HEADER_BYTES):
+                chunks.append(chunk)
+                received += len(chunk)
+                if received >= HEADER_BYTES:
+                    break
+        data = b"".join(chunks)[:HEADER_BYTES]
+        return row, replay_result.ReplayResultParser(url, 'online', data=data, header_only=True).get_replay_summary(), None
+    except FetchError as e:
+        return row, None, e.kind
+    except Exception:
+        return row, None, 'permanent'
+
+def get_new_name_worker(filepath):
+    """Parse a replay and return (filename, base name for the rename, error)"""
+    filename = os.path.basename(filepath)
+    try:
+        rep = replay_result.ReplayResultParser(filepath)
+        return (filename, rep.get_new_replay_name(), None)
+    except Exception as e:
+        return (filename, None, str(e))
+
+def plan_renames(existing_names, new_names):
+    """Resolve (filename, base name) pairs to (filename, new filename) without touching the disk.
+    Names already in the directory and names claimed earlier in the plan are never reused, so the
+    plan can be applied in any order. A file keeps its name if it comes up before a free one."""
+    taken = {os.path.normcase(name) for name in existing_names}
+    plan = []
+    for filename, base_name in new_names:
+        current = os.path.normcase(filename)
+        new_filename = f"{base_name}.rep"
+        counter = 1
+        while os.path.normcase(new_filename) != current and os.path.normcase(new_filename) in taken:
+            new_filename = f"{base_name}_{counter}.rep"
+            counter += 1
+        if os.path.normcase(new_filename) == current:
+            new_filename = filename
+        taken.add(os.path.normcase(new_filename))
+        plan.append((filename, new_filename))
+    return plan
+
+def download_reps_worker(args):
+    index, file_url, save_path = args
+    try:
+        response = fetch(file_url, request_class='replay')
+        with open(save_path, 'wb') as f:
+            f.write(response.content)
+        return (index, 'done')
+    except FetchError as e:
+        return (index, f'error:{e.kind}: {e.detail}')
+    except Exception as e:
+        return (index, f'error:{str(e)}')